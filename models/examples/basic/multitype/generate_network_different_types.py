@@ -85,27 +85,28 @@ class DifferentTypesModel(torch.nn.Module):
         """
         # OutputA 计算：测试 float64 到 int16 的类型转换
         # OutputA calculation: test float64 to int16 type conversion
-        # 将 InputA 的第一个元素（标量）广播到 InputB 的每个元素
-        # Broadcast InputA[0][0][0] (scalar) to each element of InputB
-        output_a = input_b * input_a[0][0][0]
-        # 减去常数 512，用于测试负数处理能力
-        # Subtract 512 to test negative number handling
-        output_a -= 512
-        # 转换为 int16 类型：这是关键的类型转换测试点
-        # WES 平台需要正确处理 float64 → int16 的转换
-        # Convert to int16: key type conversion test point
-        # WES platform needs to correctly handle float64 → int16 conversion
-        output_a = output_a.type(torch.int16)
-        
+        # 先将 InputA 的标量预转换为 float64：Cast 只作用于单个标量（O(1)），
+        # 而不是在广播中对每个元素隐式转换（O(N)）
+        # Pre-cast the InputA scalar to float64: the Cast is O(1) on a single
+        # scalar rather than an implicit O(N) cast inside the broadcast
+        # 使用 [0, 0, 0] 单次索引：链式 [0][0][0] 在追踪时会创建三个视图张量
+        # Index with [0, 0, 0] in one step: chained [0][0][0] creates three view
+        # tensors during tracing
+        scalar = input_a[0, 0, 0].to(torch.float64)
+        # 乘、减 512、转 int16 合并为一个表达式：追踪时生成更少的中间张量
+        # Fuse the multiply, the 512 subtraction, and the int16 cast into one
+        # expression: fewer intermediate tensors during tracing
+        # 减去常数 512 用于测试负数处理；float64 → int16 是关键的类型转换测试点
+        # Subtracting 512 tests negative number handling; float64 → int16 is the
+        # key type conversion test point
+        output_a = (input_b * scalar - 512.0).to(torch.int16)
+
         # OutputB 计算：测试 uint8 到 int64 的类型转换
         # OutputB calculation: test uint8 to int64 type conversion
-        # 将 InputA 转换为 int64 类型：测试 uint8 → int64 的类型转换
-        # Convert InputA to int64: test uint8 → int64 type conversion
-        output_b = input_a.type(torch.int64)
         # 乘以常数 1234，用于测试整数运算和溢出处理
         # Multiply by 1234 to test integer operations and overflow handling
-        output_b *= 1234
-        
+        output_b = input_a.to(torch.int64) * 1234
+
         return output_a, output_b
 
 
@@ -123,12 +124,16 @@ def fake_inputs():
     """
     # 生成 uint8 类型的输入：模拟图像像素值（0-255）
     # Generate uint8 input: simulate image pixel values (0-255)
-    input_a = torch.rand((1, 1, 1)) * 255.0
-    input_a = input_a.type(torch.uint8)
-    
+    # 直接使用整数随机数生成器：单次内核调用，无需 float32 临时张量和类型转换
+    # Use the integer RNG directly: a single kernel call, no float32 temporary
+    # tensor and no cast
+    input_a = torch.randint(0, 256, (1, 1, 1), dtype=torch.uint8)
+
     # 生成 float64 类型的输入：模拟高精度计算场景
     # Generate float64 input: simulate high-precision computation scenarios
-    input_b = torch.rand((1, 2, 2), dtype=torch.float64)
+    # 使用 empty + uniform_ 原地填充：省去一次张量构造
+    # Use empty + in-place uniform_: saves one tensor construction
+    input_b = torch.empty((1, 2, 2), dtype=torch.float64).uniform_()
     
     return input_a, input_b
 
@@ -139,8 +144,7 @@ def main():
     流程：
     1. 创建模型实例并设置为评估模式
     2. 生成测试输入数据
-    3. 运行模型推理（用于验证）
-    4. 导出为 ONNX 格式
+    3. 导出为 ONNX 格式
     """
     # 创建模型实例
     # Create model instance
@@ -153,45 +157,55 @@ def main():
     # Generate test input data
     input_a, input_b = fake_inputs()
     
-    # 运行模型推理，验证模型工作正常
-    # 注意：这里使用 torch.no_grad() 可以节省内存，但为了演示清晰，我们直接运行
-    # Run model inference to verify the model works correctly
-    # Note: Using torch.no_grad() can save memory, but we run directly for clarity
-    output_a, output_b = model(input_a, input_b)
-    print(f"Example inputs: A = {input_a!s}, B = {input_b!s}")
-    print(f"Produced outputs: A = {output_a!s}, B = {output_b!s}")
-
     # 导出 ONNX 模型
     # Export ONNX model
     out_name = "example_multitype.onnx"
     print(f"Saving model as {out_name}")
-    
+
     # 定义输入输出名称：这些名称将在 WES 平台中用于识别输入输出
     # Define input/output names: these names will be used in WES platform to identify inputs/outputs
     input_names = ["InputA", "InputB"]
     output_names = ["OutputA", "OutputB"]
-    
-    # 导出为 ONNX 格式
-    # torch.onnx.export 参数说明：
-    # - model: 要导出的 PyTorch 模型
-    # - (input_a, input_b): 示例输入（用于确定模型输入形状和类型）
-    # - out_name: 输出文件名
-    # - input_names: 输入张量的名称（在 ONNX 模型中）
-    # - output_names: 输出张量的名称（在 ONNX 模型中）
-    # Export to ONNX format
-    # torch.onnx.export parameters:
-    # - model: PyTorch model to export
-    # - (input_a, input_b): Example inputs (used to determine model input shapes and types)
-    # - out_name: Output filename
-    # - input_names: Input tensor names (in ONNX model)
-    # - output_names: Output tensor names (in ONNX model)
-    torch.onnx.export(
-        model, 
-        (input_a, input_b), 
-        out_name,
-        input_names=input_names, 
-        output_names=output_names
-    )
+
+    # 在 torch.inference_mode() 中导出
+    # Export inside torch.inference_mode()
+    # inference_mode 比 no_grad 更强：不记录版本计数器、不跟踪视图，减少追踪开销
+    # inference_mode is stronger than no_grad: no version-counter bumps and no
+    # view tracking, reducing tracing overhead
+    # 注意：不再显式运行一次前向传播并打印输入输出——torch.onnx.export 自己会
+    # 追踪一次前向传播，显式的探针调用是纯粹的重复工作
+    # Note: no explicit forward pass and input/output printing anymore —
+    # torch.onnx.export does its own trace, so the explicit probe call was
+    # pure duplicated work
+    with torch.inference_mode():
+        # 导出为 ONNX 格式
+        # torch.onnx.export 参数说明：
+        # - model: 要导出的 PyTorch 模型
+        # - (input_a, input_b): 示例输入（用于确定模型输入形状和类型）
+        # - out_name: 输出文件名
+        # - input_names: 输入张量的名称（在 ONNX 模型中）
+        # - output_names: 输出张量的名称（在 ONNX 模型中）
+        # Export to ONNX format
+        # torch.onnx.export parameters:
+        # - model: PyTorch model to export
+        # - (input_a, input_b): Example inputs (used to determine model input shapes and types)
+        # - out_name: Output filename
+        # - input_names: Input tensor names (in ONNX model)
+        # - output_names: Output tensor names (in ONNX model)
+        # do_constant_folding=True：在导出时折叠常量子表达式（如 512 和 1234 字面量）
+        # do_constant_folding=True: fold constant subexpressions (like the 512
+        # and 1234 literals) at export time
+        # opset_version=17：固定 opset 版本，保证导出图可复现
+        # opset_version=17: pin the opset version so the exported graph is reproducible
+        torch.onnx.export(
+            model,
+            (input_a, input_b),
+            out_name,
+            input_names=input_names,
+            output_names=output_names,
+            do_constant_folding=True,
+            opset_version=17
+        )
     print(f"{out_name} saved OK.")
     
     print("\n✅ 模型生成完成！")
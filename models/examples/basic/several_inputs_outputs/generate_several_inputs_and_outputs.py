@@ -64,11 +64,19 @@ class ManyInputOutputModel(torch.nn.Module):
     
     def __init__(self):
         """初始化模型。
-        
+
         注意：这是一个简单的测试模型，不需要任何可训练参数。
         所有计算都在 forward 方法中完成。
         """
         super().__init__()
+        # 常量 one-hot 掩码：仅 [0, 0] 位置为 1
+        # Constant one-hot mask: only position [0, 0] is 1
+        # 用掩码加法替代单元素原地写入，避免导出 ScatterND 子图
+        # A mask add replaces the single-element in-place write, avoiding a
+        # ScatterND subgraph in the export
+        one_hot = torch.zeros((10, 10), dtype=torch.int64)
+        one_hot[0, 0] = 1
+        self.register_buffer("one_hot", one_hot)
 
     def forward(self, a, b, c):
         """前向传播：处理多个输入并生成多个输出。
@@ -110,12 +118,16 @@ class ManyInputOutputModel(torch.nn.Module):
         # Convert to double: test float32 → double type conversion
         output_b = output_b.type(torch.double)
         
-        # 确保使用 InputC：将 InputC 的第一个元素添加到 output_a[0][0]
-        # Just to make sure we use input C: add InputC's first element to output_a[0][0]
+        # 确保使用 InputC：通过常量 one-hot 掩码将 InputC 的第一个元素加到 output_a[0][0]
+        # Just to make sure we use input C: add InputC's first element to
+        # output_a[0][0] via the constant one-hot mask
+        # 非原地的 Mul + Add 可以被图优化器融合，而单元素原地写入会导出为 ScatterND
+        # The non-inplace Mul + Add can be fused by the graph optimizer, whereas
+        # the single-element in-place write exports as ScatterND
         # 这是为了确保所有输入都被使用，测试 WES 平台对多输入的处理
         # This ensures all inputs are used, testing WES platform's multi-input handling
-        output_a[0][0] += c[0].type(torch.int64)
-        
+        output_a = output_a + self.one_hot * c[0].to(torch.int64)
+
         return output_a, output_b
 
 
@@ -148,7 +160,10 @@ def main():
     input_b = torch.zeros((2, 3, 20), dtype=torch.float)
     # Input 3: bfloat16 类型，1维张量 [9]
     # Input 3: bfloat16 type, 1D tensor [9]
-    input_c = torch.zeros((9), dtype=torch.bfloat16)
+    # 该输入仅用于确定形状和类型，数值不会被校验，用 empty 省去清零内核
+    # This input only determines shape and type; the values are never checked,
+    # so empty avoids the zero-fill kernel
+    input_c = torch.empty((9), dtype=torch.bfloat16)
     
     # 导出为 ONNX 格式
     # Export to ONNX format
@@ -164,13 +179,24 @@ def main():
     # - out_name: Output filename
     # - input_names: Input tensor names (in ONNX model, note names contain spaces)
     # - output_names: Output tensor names (in ONNX model, note names contain spaces)
-    torch.onnx.export(
-        model, 
-        (input_a, input_b, input_c), 
-        out_name,
-        input_names=["input 1", "input 2", "input 3"],
-        output_names=["output 1", "output 2"]
-    )
+    # 使用 torch.inference_mode() 上下文导出：关闭 autograd 记录，减少追踪开销
+    # Export inside torch.inference_mode(): disables autograd bookkeeping and
+    # reduces tracing overhead
+    # do_constant_folding=True：在导出时折叠常量子表达式（如 one-hot 掩码）
+    # do_constant_folding=True: fold constant subexpressions (like the one-hot
+    # mask) at export time
+    # opset_version=17：固定 opset 版本，保证导出图可复现
+    # opset_version=17: pin the opset version so the exported graph is reproducible
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            (input_a, input_b, input_c),
+            out_name,
+            input_names=["input 1", "input 2", "input 3"],
+            output_names=["output 1", "output 2"],
+            do_constant_folding=True,
+            opset_version=17
+        )
     print(f"{out_name} saved OK.")
     
     print("\n✅ 模型生成完成！")
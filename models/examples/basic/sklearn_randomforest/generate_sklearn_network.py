@@ -60,9 +60,18 @@ inputs_train, inputs_test, outputs_train, outputs_test = train_test_split(inputs
 
 # 创建并训练随机森林分类器
 # Create and train RandomForest classifier
-# 随机森林使用默认参数，适合快速测试
-# RandomForest uses default parameters, suitable for quick testing
-classifier = RandomForestClassifier()
+# 固定 n_estimators/max_depth：导出的 ONNX 图大小与树的数量和深度成正比，
+# 10 棵深度 4 的树在 Iris 上精度几乎不变，但模型文件缩小约 10 倍
+# Fix n_estimators/max_depth: the exported ONNX graph size scales with tree
+# count and depth; 10 trees of depth 4 keep Iris accuracy essentially
+# unchanged while shrinking the model file by ~10x
+# n_jobs=-1：使用所有 CPU 核心并行训练
+# n_jobs=-1: train in parallel on all CPU cores
+# random_state=0：保证生成的模型可复现
+# random_state=0: make the generated model reproducible
+classifier = RandomForestClassifier(
+    n_estimators=10, max_depth=4, n_jobs=-1, random_state=0
+)
 classifier.fit(inputs_train, outputs_train)
 
 # 转换为 ONNX 格式
@@ -76,30 +85,45 @@ output_filename = "sklearn_randomforest.onnx"
 # Use first sample as example input to determine input shape and type
 onnx_content = to_onnx(classifier, inputs[:1])
 
+# 只序列化一次：文件写入和下面的推理会话共用同一份字节
+# Serialize once: the file write and the inference session below share the
+# same bytes
+serialized_model = onnx_content.SerializeToString()
+
 # 保存 ONNX 模型文件
 # Save ONNX model file
 with open(output_filename, "wb") as f:
-    f.write(onnx_content.SerializeToString())
+    f.write(serialized_model)
 
 # 使用 ONNX Runtime 验证模型
 # Verify model with ONNX Runtime
 import onnxruntime as ort
 
-def float_formatter(f):
-    """
-    浮点数格式化函数：保留 6 位小数
-    
-    Float formatter function: keep 6 decimal places
-    """
-    return f"{float(f):.06f}"
-
-# 设置 numpy 打印格式：使用自定义格式化函数
-# Set numpy print format: use custom formatter function
-np.set_printoptions(formatter={'float_kind': float_formatter})
+# 设置 numpy 打印格式：保留 6 位小数
+# Set numpy print format: keep 6 decimal places
+# precision/suppress 由 C 层实现，避免逐元素调用 Python 级格式化函数
+# precision/suppress are implemented in C, avoiding a per-element Python-level
+# formatter call
+np.set_printoptions(precision=6, suppress=True)
 
 # 创建 ONNX Runtime 推理会话
 # Create ONNX Runtime inference session
-session = ort.InferenceSession(output_filename)
+# 直接传入内存中的序列化字节：跳过对刚写出的文件的重新读取和 protobuf 解析
+# Pass the in-memory serialized bytes directly: skips re-reading and re-parsing
+# the file that was just written
+# 显式开启全部图优化：树集成模型的节点融合只有在 ORT_ENABLE_ALL 下才会执行
+# Explicitly enable all graph optimizations: tree-ensemble node fusions only
+# run at ORT_ENABLE_ALL
+sess_options = ort.SessionOptions()
+sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+# 显式指定 CPUExecutionProvider：避免会话创建时的 provider 自动探测开销
+# Explicitly pin CPUExecutionProvider: avoids provider auto-detection overhead
+# at session creation
+session = ort.InferenceSession(
+    serialized_model,
+    sess_options=sess_options,
+    providers=["CPUExecutionProvider"]
+)
 
 # 打印模型的输入输出信息
 # Print model input/output information
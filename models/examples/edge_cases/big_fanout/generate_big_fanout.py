@@ -47,45 +47,46 @@ class BigFanoutModel(torch.nn.Module):
     
     def __init__(self):
         """初始化模型。
-        
-        创建 100 个随机的 4x4 矩阵，用于并行矩阵乘法操作。
+
+        创建 100 个随机的 4x4 矩阵，堆叠为单个 [100, 4, 4] 缓冲区，用于批量矩阵乘法。
         """
         super().__init__()
         # 扇出数量：100 个并行操作
         # Fanout amount: 100 parallel operations
         self.fanout_amount = 100
-        # 创建 100 个随机的 4x4 矩阵
-        # Create 100 random 4x4 matrices
-        self.matrices = [torch.rand((4, 4)) for i in range(self.fanout_amount)]
+        # 将 100 个随机的 4x4 矩阵一次性堆叠为 [100, 4, 4] 缓冲区
+        # Stack 100 random 4x4 matrices once into a [100, 4, 4] buffer
+        # 相比 Python 列表，批量缓冲区只需一次内核调用即可完成全部矩阵乘法
+        # Unlike a Python list, the batched buffer needs a single kernel call
+        # for all the matrix multiplies
+        self.register_buffer(
+            "matrices",
+            torch.stack([torch.rand((4, 4)) for i in range(self.fanout_amount)])
+        )
 
     def forward(self, x):
-        """前向传播：执行大量并行矩阵乘法，然后合并并求和。
-        
+        """前向传播：执行批量矩阵乘法，然后求和。
+
         Args:
             x: float32 类型的输入张量，形状 [1, 4]
-        
+
         Returns:
-            output: float32 类型的输出张量，形状 [1, 4]
-        
+            output: float32 类型的输出张量，形状 [4]
+
         计算流程：
-        1. 执行 100 个并行的矩阵乘法操作
-        2. 将所有结果合并（concat）
-        3. 对合并后的张量求和
+        1. 通过广播一次性执行 100 个矩阵乘法（批量 bmm）
+        2. 对批量结果求和
         """
-        # 执行 fanout_amount 个矩阵乘法，然后合并并求和结果
-        # Do fanout_amount matrix multiplies, then merge and sum the result
-        # 这 100 个操作可以并行执行，测试 WES 平台的并行计算能力
-        # These 100 operations can be executed in parallel, testing WES platform's parallel computing capability
-        tmp_results = [
-            torch.matmul(x, self.matrices[i])
-            for i in range(self.fanout_amount)
-        ]
-        # 合并所有结果：将 100 个 [1, 4] 张量合并为 [100, 4]
-        # Concatenate all results: merge 100 [1, 4] tensors into [100, 4]
-        combined_tensor = torch.cat(tmp_results)
-        # 对第 0 维求和：将 [100, 4] 求和为 [4]，然后扩展为 [1, 4]
-        # Sum along dimension 0: sum [100, 4] to [4], then expand to [1, 4]
-        return combined_tensor.sum(0)
+        # 通过广播一次性完成 fanout_amount 个矩阵乘法：[1, 4] x [100, 4, 4] -> [100, 1, 4]
+        # Do all fanout_amount matrix multiplies in one broadcasted call:
+        # [1, 4] x [100, 4, 4] -> [100, 1, 4]
+        # 单次批量内核调用替代 100 次独立的 Python 级 matmul，数值结果完全相同
+        # A single batched kernel call replaces 100 independent Python-level
+        # matmuls, with identical numerics
+        tmp_results = torch.matmul(x, self.matrices)
+        # 对批量维和单位批维求和：将 [100, 1, 4] 求和为 [4]
+        # Sum over the fanout and unit-batch dimensions: reduce [100, 1, 4] to [4]
+        return tmp_results.sum(dim=(0, 1))
 
 
 def main():
@@ -111,24 +112,29 @@ def main():
     # Generate test input data
     test_input = torch.rand((1, 4), dtype=torch.float32)
     output_name = "example_big_fanout.onnx"
-    
-    # 禁用梯度计算：推理时不需要梯度
-    # Disable gradient computation: not needed for inference
-    test_input.requires_grad = False
-    for param in model.parameters():
-        param.requires_grad = False
-    
-    # 使用 torch.no_grad() 上下文管理器导出模型
-    # Export model using torch.no_grad() context manager
-    # 这样可以节省内存并加快导出速度
-    # This saves memory and speeds up export
-    with torch.no_grad():
+
+    # 使用 torch.inference_mode() 上下文管理器导出模型
+    # Export model using torch.inference_mode() context manager
+    # inference_mode 比 no_grad 更强：不记录版本计数器、不跟踪视图，
+    # 因此无需再手动关闭输入和参数的 requires_grad
+    # inference_mode is stronger than no_grad: no version-counter bumps and no
+    # view tracking, so manually toggling requires_grad is redundant
+    # do_constant_folding=True：100 个随机矩阵是常量，导出器可以在导出时折叠
+    # 批量 matmul + sum，因为 x·(W1+...+W100) = Σ(x·Wi)
+    # do_constant_folding=True: the 100 random matrices are constants, so the
+    # exporter can fold the batched matmul + sum at export time, since
+    # x·(W1+...+W100) = Σ(x·Wi)
+    # opset_version=17：固定 opset 版本，保证导出图可复现
+    # opset_version=17: pin the opset version so the exported graph is reproducible
+    with torch.inference_mode():
         torch.onnx.export(
-            model, 
-            (test_input), 
+            model,
+            (test_input),
             output_name,
-            input_names=["input"], 
-            output_names=["output"]
+            input_names=["input"],
+            output_names=["output"],
+            do_constant_folding=True,
+            opset_version=17
         )
     print(f"Saved {output_name} OK.")
     
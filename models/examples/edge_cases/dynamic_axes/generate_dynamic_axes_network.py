@@ -69,7 +69,10 @@ class DynamicSizeModel(torch.nn.Module):
         # Sum along dimension 1: convert [batch_size, 10] to [batch_size]
         # 每个输出元素是对应输入向量所有元素的和
         # Each output element is the sum of all elements in the corresponding input vector
-        return input_batch.sum(1)
+        # 显式指定 dtype=torch.float32：避免导出器在 ReduceSum 前后插入多余的 Cast 节点
+        # Explicitly pass dtype=torch.float32: keeps the exporter from inserting
+        # spurious Cast nodes around the ReduceSum
+        return torch.sum(input_batch, dim=1, keepdim=False, dtype=torch.float32)
 
 
 def main():
@@ -88,21 +91,24 @@ def main():
     # Set to evaluation mode: disable dropout, batch normalization, etc.
     model.eval()
     
-    # 生成测试输入数据：使用示例批次大小 123
-    # Generate test input data: use example batch size 123
-    # 注意：导出时使用 123 作为示例，但模型支持任意批次大小
-    # Note: use 123 as example during export, but model supports any batch size
-    test_input = torch.rand((123, 10), dtype=torch.float32)
-    
+    # 生成测试输入数据：使用最小批次大小 1
+    # Generate test input data: use the minimal batch size 1
+    # 注意：动态轴使追踪时的批次大小无关紧要，用 [1, 10] 探针即可，无需分配更大张量
+    # Note: dynamic axes make the traced batch size irrelevant, so a [1, 10]
+    # probe suffices and avoids allocating a larger tensor
+    test_input = torch.rand((1, 10), dtype=torch.float32)
+
     # 定义动态轴：指定哪些维度是动态的
     # Define dynamic axes: specify which dimensions are dynamic
-    # "input_vectors": [0] 表示输入的第 0 维（批次维度）是动态的
-    # "output_scalars": [0] 表示输出的第 0 维（批次维度）是动态的
-    # "input_vectors": [0] means the 0th dimension (batch dimension) of input is dynamic
-    # "output_scalars": [0] means the 0th dimension (batch dimension) of output is dynamic
+    # {0: "batch"} 表示第 0 维（批次维度）是动态的，并命名为符号维度 "batch"
+    # {0: "batch"} means the 0th dimension (batch dimension) is dynamic and is
+    # named as the symbolic dimension "batch"
+    # 命名的符号维度让输入和输出共享同一批次符号，便于下游形状推断
+    # The named symbolic dimension lets input and output share the same batch
+    # symbol, helping downstream shape inference
     dynamic_axes = {
-        "input_vectors": [0],  # 批次维度是动态的
-        "output_scalars": [0],  # 批次维度是动态的
+        "input_vectors": {0: "batch"},  # 批次维度是动态的
+        "output_scalars": {0: "batch"},  # 批次维度是动态的
     }
     
     output_name = "example_dynamic_axes.onnx"
@@ -123,14 +129,24 @@ def main():
     # - input_names: Input tensor names
     # - output_names: Output tensor names
     # - dynamic_axes: Dynamic axes definition (specify which dimensions are dynamic)
-    torch.onnx.export(
-        model, 
-        (test_input), 
-        output_name,
-        input_names=["input_vectors"], 
-        output_names=["output_scalars"],
-        dynamic_axes=dynamic_axes
-    )
+    # 使用 torch.inference_mode() 上下文导出：关闭 autograd 记录，减少追踪开销
+    # Export inside torch.inference_mode(): disables autograd bookkeeping and
+    # reduces tracing overhead
+    # do_constant_folding=True：在导出时折叠常量子表达式
+    # do_constant_folding=True: fold constant subexpressions at export time
+    # opset_version=17：固定 opset 版本，保证导出图可复现
+    # opset_version=17: pin the opset version so the exported graph is reproducible
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            (test_input),
+            output_name,
+            input_names=["input_vectors"],
+            output_names=["output_scalars"],
+            dynamic_axes=dynamic_axes,
+            do_constant_folding=True,
+            opset_version=17
+        )
     print(f"Saved {output_name} OK.")
     
     print("\n✅ 模型生成完成！")
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 # This script generates the .onnx file with a bunch of different special chars
-# in the filename. It takes a 1x2 uint32 tensor and produces a 1x1-element
-# uint32 output containing the sum of the 2 inputs.
+# in the filename. It takes a 1x2 uint8 tensor and produces a 1-element
+# uint8 output containing the sum of the 2 inputs.
 
 """
 特殊字符文件名 ONNX 模型生成脚本（中文注释补充）
@@ -16,8 +16,10 @@
 - 验证文件名编码处理
 
 模型说明：
-- 输入：1x2 形状的 int32 张量
-- 输出：1x1 形状的 int32 张量（两个输入的和）
+- 输入：1x2 形状的 uint8 张量
+- 输出：1 形状的 uint8 张量（两个输入的和）
+- 数据类型：uint8 将模型尺寸与内存流量较 int32 缩小 4 倍，
+  并让带整数点积单元的硬件走 int8 快速路径
 - 文件名：包含 Unicode 特殊字符（ż, 大, 김）
 
 WES 平台测试场景：
@@ -32,9 +34,27 @@ WES 平台测试场景：
 依赖要求：
     pip install torch onnx
 """
+import hashlib
+from pathlib import Path
+
 import torch
 
 
+def export_cache_key(input_shape) -> str:
+    """计算导出缓存键（脚本内容 + torch 版本 + 输入形状的 SHA-256）。
+
+    三者都未变化时导出结果是确定的，重复运行可以直接跳过。
+
+    The export is deterministic while all three stay unchanged, so re-runs can
+    be skipped outright.
+    """
+    return hashlib.sha256(
+        Path(__file__).read_bytes()
+        + torch.__version__.encode()
+        + repr(input_shape).encode()
+    ).hexdigest()
+
+
 class AddModel(torch.nn.Module):
     """加法模型。
     
@@ -53,17 +73,19 @@ class AddModel(torch.nn.Module):
         """前向传播：对输入求和。
         
         Args:
-            inputs: int32 类型的输入张量，形状 [1, 2]
+            inputs: uint8 类型的输入张量，形状 [1, 2]
         
         Returns:
-            output: int32 类型的输出张量，形状 [1, 1]
+            output: uint8 类型的输出张量，形状 [1]
                     包含两个输入元素的和
         """
         # 对第 1 维求和：将 [1, 2] 转换为 [1]
         # Sum along dimension 1: convert [1, 2] to [1]
-        # 转换为 int 类型：确保输出类型正确
-        # Convert to int type: ensure correct output type
-        return inputs.sum(1).int()
+        # 输出保持 uint8：相比 int32 把张量字节数缩小 4 倍，
+        # 并覆盖 WES 的 int8/uint8 数据类型测试路径
+        # Keep the output uint8: 4x fewer tensor bytes than int32, and this
+        # covers the WES int8/uint8 datatype test path
+        return inputs.sum(1).to(torch.uint8)
 
 
 def main():
@@ -83,7 +105,10 @@ def main():
     
     # 生成测试输入数据：全为 1
     # Generate test input data: all ones
-    x = torch.ones((1, 2), dtype=torch.int32)
+    # uint8 输入：两个 1 的和远在 uint8 范围内，小数据类型即可覆盖用例
+    # uint8 input: the sum of two ones is well within uint8 range, so the
+    # smaller datatype covers the use case
+    x = torch.ones((1, 2), dtype=torch.uint8)
     
     # 使用包含 Unicode 特殊字符的文件名
     # Use filename with Unicode special characters
@@ -92,18 +117,43 @@ def main():
     # 这用于测试 WES 平台对 Unicode 文件名的支持
     # This tests WES platform's support for Unicode filenames
     file_name = "example ż 大 김.onnx"
-    
+
+    # 导出缓存：脚本、torch 版本和输入形状都没变时重复运行是空操作
+    # Export cache: re-runs are no-ops when the script, torch version and input
+    # shape are all unchanged
+    cache_key = export_cache_key((tuple(x.shape), str(x.dtype)))
+    hash_path = Path(file_name + ".hash")
+    if (
+        Path(file_name).exists()
+        and hash_path.exists()
+        and hash_path.read_text() == cache_key
+    ):
+        print(f"{file_name} cached, skipping export.")
+        return
+
     # 导出为 ONNX 格式
     # Export to ONNX format
-    torch.onnx.export(
-        model, 
-        (x,), 
-        file_name, 
-        input_names=["in"],
-        output_names=["out"]
-    )
+    # 使用 torch.inference_mode() 上下文导出：关闭 autograd 记录，减少追踪开销
+    # Export inside torch.inference_mode(): disables autograd bookkeeping and
+    # reduces tracing overhead
+    # 固定使用传统导出器：in/out 这两个名字是 WES 测试识别输入输出的契约，
+    # dynamo_export 会生成自动命名的图接口，产物的 IO 契约不能依赖
+    # 安装的 torch 版本
+    # Deliberately the legacy exporter: the in/out names are the contract WES
+    # tests use to identify inputs/outputs; dynamo_export emits auto-generated
+    # graph IO names, and the artifact's IO contract must not depend on the
+    # installed torch version
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            (x,),
+            file_name,
+            input_names=["in"],
+            output_names=["out"]
+        )
     print(f"{file_name} saved OK.")
-    
+    hash_path.write_text(cache_key)
+
     print("\n✅ 模型生成完成！")
     print("📝 该模型可用于测试 WES 平台对 Unicode 文件名的支持能力。")
     print("📖 详细使用说明请参考 README.md")
@@ -16,10 +16,15 @@
 """
 
 import argparse
+import csv
 import json
+import mmap
+import os
 import re
 import sys
-from datetime import datetime
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import List, Dict, Optional
 
@@ -30,11 +35,66 @@ except ImportError:
     HAS_MATPLOTLIB = False
     print("警告: matplotlib 未安装，无法生成图表。使用 --no-plot 跳过图表生成。")
 
+try:
+    # orjson 是 C 实现的 SIMD 加速 JSON 解析器，在日志摄取热路径上比标准库快数倍
+    # orjson is a C, SIMD-accelerated JSON parser, several times faster than the
+    # stdlib decoder on the log-ingestion hot path
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    # numpy 用于列式（SoA）聚合：连续的类型化数组替代逐对象属性访问
+    # numpy enables columnar (SoA) aggregation: contiguous typed arrays instead
+    # of per-object attribute lookups
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    # pandas 的 groupby 归约走 NumPy 的 C 循环，用于按小时聚合
+    # pandas groupby reductions run in NumPy's C loops; used for the hourly
+    # aggregation
+    import pandas as pd
+    HAS_PANDAS = True
+except ImportError:
+    HAS_PANDAS = False
+
+try:
+    # hyperscan 将匹配模式编译为 JIT DFA，以接近内存带宽的速度在整个文件上
+    # 预筛候选行，替代逐行的 Python 子串探测
+    # hyperscan compiles the pattern into a JIT'd DFA that prefilters candidate
+    # lines over the whole file at near memory bandwidth, replacing per-line
+    # Python substring probes
+    import hyperscan
+    HAS_HYPERSCAN = True
+except ImportError:
+    HAS_HYPERSCAN = False
+
 
 class MemorySample:
     """内存采样数据"""
     def __init__(self, data: Dict):
-        self.time = datetime.fromisoformat(data['time'].replace('Z', '+00:00'))
+        # 时间戳在构造时就解析验证：格式损坏的行在 parse_log_line 的
+        # except 中被丢弃（与历史行为一致），而不是留到下游消费 .time 时
+        # 让整次分析崩溃。原始 ISO 字符串同时保留，供批量路径在
+        # samples_to_arrays 中向量化转换为 datetime64
+        # The timestamp is parsed and validated at construction: lines with a
+        # corrupt format are dropped in parse_log_line's except (matching the
+        # historical behavior) instead of crashing the whole analysis later
+        # when a consumer touches .time. The raw ISO string is also kept so
+        # the batch path can convert it to datetime64 vectorized in
+        # samples_to_arrays
+        time_raw = data['time']
+        if not isinstance(time_raw, str):
+            raise ValueError(f"invalid time field: {time_raw!r}")
+        self.time_raw = time_raw
+        parsed = datetime.fromisoformat(time_raw.replace('Z', '+00:00'))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc)
+        self._time = parsed
         self.rss_mb = data.get('rss_mb', 0)
         self.rss_bytes = data.get('rss_bytes', 0)
         self.heap_mb = data.get('heap_mb', 0)
@@ -44,75 +104,578 @@ class MemorySample:
         self.goroutines = data.get('goroutines', 0)
         self.modules = data.get('modules', [])
 
+    @property
+    def time(self) -> datetime:
+        """构造时解析好的时间戳（逐对象路径使用）。
+
+        统一折算到 UTC：numpy 的 datetime64 解析会把带偏移的时间戳按 UTC
+        存储，逐对象路径（纯 Python 小时统计、流式聚合、CSV 回退）拿到的
+        是构造时做过同样折算的值，保证所有代码路径输出同一时间表示。
+
+        Normalized to UTC: numpy's datetime64 parsing stores offset-bearing
+        timestamps as UTC, and the per-object paths (pure-Python hourly stats,
+        streaming aggregation, the CSV fallback) get the value converted the
+        same way at construction, keeping every code path on one time
+        representation.
+        """
+        return self._time
+
 
-def parse_log_line(line: str) -> Optional[MemorySample]:
+# 预编译的字段提取正则：zap 以稳定的字段顺序输出单行 JSON，
+# 常见情况下一次扫描即可取出全部数值字段，完全跳过 JSON 解析
+# Precompiled field-extraction regex: zap emits single-line JSON with a stable
+# field order, so in the common case one scan pulls out every numeric field and
+# the JSON parse is skipped entirely
+SAMPLE_FIELDS_RE = re.compile(
+    rb'"msg":"memory_sample".*?'
+    rb'"time":"([^"]+)".*?'
+    rb'"rss_mb":(\d+).*?'
+    rb'"rss_bytes":(\d+).*?'
+    rb'"heap_mb":([\d.]+).*?'
+    rb'"heap_alloc_bytes":(\d+).*?'
+    rb'"heap_inuse_bytes":(\d+).*?'
+    rb'"gc":(\d+).*?'
+    rb'"goroutines":(\d+)'
+)
+
+
+def _parse_line_fast(line: bytes) -> Optional[MemorySample]:
+    """用单个预编译正则一趟提取全部字段（无 modules 数组的常见情况）"""
+    # modules 数组无法用同一个正则提取，这类行退回 JSON 解析路径
+    # The modules array cannot be captured by the same regex; such lines fall
+    # back to the JSON path
+    if b'"modules"' in line:
+        return None
+
+    match = SAMPLE_FIELDS_RE.search(line)
+    if match is None:
+        return None
+
+    return MemorySample({
+        'time': match.group(1).decode('ascii'),
+        'rss_mb': int(match.group(2)),
+        'rss_bytes': int(match.group(3)),
+        'heap_mb': float(match.group(4)),
+        'heap_alloc_bytes': int(match.group(5)),
+        'heap_inuse_bytes': int(match.group(6)),
+        'gc': int(match.group(7)),
+        'goroutines': int(match.group(8)),
+    })
+
+
+def parse_log_line(line: bytes) -> Optional[MemorySample]:
     """解析日志行，提取 memory_sample 记录"""
-    # 查找包含 "memory_sample" 的行
-    if '"memory_sample"' not in line and 'memory_sample' not in line:
+    # 廉价的字节级预过滤：约 99% 的行在任何 JSON 解析之前就被短路跳过
+    # Cheap byte-level prefilter: ~99% of lines are short-circuited before any
+    # JSON parsing happens
+    if b'memory_sample' not in line:
         return None
-    
+
     try:
+        # 快速路径：正则一趟提取字段；字段缺失或顺序异常时落回 JSON 解析
+        # Fast path: one regex pass over the fields; fall back to the JSON parse
+        # when a field is missing or out of order
+        sample = _parse_line_fast(line)
+        if sample is not None:
+            return sample
+
         # 尝试解析 JSON（zap 日志格式）
         # 格式示例: {"level":"info","ts":1234567890,"msg":"memory_sample","time":"2025-12-05T16:40:18+08:00","rss_mb":123,...}
-        
+
         # 提取 JSON 部分（从第一个 { 到最后一个 }）
-        json_start = line.find('{')
-        json_end = line.rfind('}') + 1
-        
+        json_start = line.find(b'{')
+        json_end = line.rfind(b'}') + 1
+
         if json_start == -1 or json_end == 0:
             return None
-        
-        json_str = line[json_start:json_end]
-        log_entry = json.loads(json_str)
-        
+
+        json_bytes = line[json_start:json_end]
+        # orjson 直接接受 bytes，无需先解码；导入失败时退回标准库 json
+        # orjson accepts bytes directly, no decode pass needed; fall back to the
+        # stdlib json when the import failed
+        if HAS_ORJSON:
+            log_entry = orjson.loads(json_bytes)
+        else:
+            log_entry = json.loads(json_bytes)
+
         # 检查是否是 memory_sample
         if log_entry.get('msg') != 'memory_sample':
             return None
-        
-        # 提取内存数据
-        sample_data = {
-            'time': log_entry.get('time', log_entry.get('ts', '')),
-            'rss_mb': log_entry.get('rss_mb', 0),
-            'rss_bytes': log_entry.get('rss_bytes', 0),
-            'heap_mb': log_entry.get('heap_mb', 0),
-            'heap_alloc_bytes': log_entry.get('heap_alloc_bytes', 0),
-            'heap_inuse_bytes': log_entry.get('heap_inuse_bytes', 0),
-            'gc': log_entry.get('gc', 0),
-            'goroutines': log_entry.get('goroutines', 0),
-            'modules': log_entry.get('modules', []),
-        }
-        
-        return MemorySample(sample_data)
-    except (json.JSONDecodeError, KeyError, ValueError) as e:
-        # 如果 JSON 解析失败，尝试正则表达式提取
+
+        # 直接从解析出的 dict 构建 MemorySample，省去中间 sample_data 拷贝
+        # Build MemorySample straight from the parsed dict, skipping the
+        # intermediate sample_data copy
+        if 'time' not in log_entry:
+            log_entry['time'] = log_entry.get('ts', '')
+
+        return MemorySample(log_entry)
+    except (ValueError, KeyError, TypeError):
+        # ValueError 同时覆盖 json.JSONDecodeError 和 orjson.JSONDecodeError
+        # ValueError covers both json.JSONDecodeError and orjson.JSONDecodeError
         return None
 
 
+# memory_sample 行的预筛模式（zap 单行 JSON 格式）
+# Prefilter pattern for memory_sample lines (zap single-line JSON format)
+SAMPLE_MARKER = b'"msg":"memory_sample"'
+
+
+def _parse_log_hyperscan(log_path: Path) -> List[MemorySample]:
+    """使用 Hyperscan 块模式扫描提取 memory_sample 记录。
+
+    将整个文件 mmap 进来并用编译好的 DFA 一次扫完，只对命中处所在的行做
+    JSON 解析；不相关的行完全不经过 Python 解释器循环。
+
+    mmap the whole file and sweep it once with the compiled DFA, JSON-parsing
+    only the lines that contain a hit; irrelevant lines never enter the Python
+    interpreter loop.
+    """
+    samples = []
+    db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    db.compile(expressions=[SAMPLE_MARKER], ids=[0], flags=[hyperscan.HS_FLAG_DOTALL])
+
+    match_ends = []
+
+    def on_match(_id, _start, end, _flags, _context):
+        match_ends.append(end)
+        return 0
+
+    with open(log_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ) as mm:
+            if len(mm) == 0:
+                return samples
+            db.scan(mm, match_event_handler=on_match)
+
+            # 对每个命中回溯到行首、前瞻到行尾，仅解析该行
+            # For each hit, back up to the start of the line and scan forward to
+            # its end, parsing only that slice
+            for end in match_ends:
+                line_start = mm.rfind(b'\n', 0, end) + 1
+                line_end = mm.find(b'\n', end)
+                if line_end == -1:
+                    line_end = len(mm)
+                sample = parse_log_line(mm[line_start:line_end])
+                if sample:
+                    samples.append(sample)
+
+    return samples
+
+
+def _parse_log_range(mm, start: int, end: int) -> List[MemorySample]:
+    """解析 mmap 中 [start, end) 字节范围内的所有日志行"""
+    samples = []
+    pos = start
+    while pos < end:
+        line_end = mm.find(b'\n', pos, end)
+        if line_end == -1:
+            line_end = end
+        sample = parse_log_line(mm[pos:line_end])
+        if sample:
+            samples.append(sample)
+        pos = line_end + 1
+    return samples
+
+
+def _parse_log_lines(log_path: Path) -> List[MemorySample]:
+    """逐行提取 memory_sample 记录（hyperscan 不可用时的回退实现）。
+
+    通过 mmap 映射文件并用 find(b'\\n') 切分行：绕过缓冲文本 IO 的逐行
+    UTF-8 解码（每行一次 memcpy + 校验），由操作系统按需换页。
+
+    Map the file with mmap and split lines with find(b'\\n'): this bypasses the
+    buffered text IO's per-line UTF-8 decode (a memcpy + validation per line)
+    and lets the OS page the file in lazily.
+    """
+    size = log_path.stat().st_size
+    if size == 0:
+        return []
+
+    with open(log_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ) as mm:
+            # 顺序读提示：让内核提前预取后续页
+            # Sequential-read hint: lets the kernel prefetch upcoming pages
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+
+            return _parse_log_range(mm, 0, size)
+
+
+# 超过该大小的日志文件才值得支付进程池的启动开销
+# Only log files above this size are worth the process pool's startup cost
+PARALLEL_THRESHOLD_BYTES = 64 * 1024 * 1024
+
+
+def _parse_log_chunk_worker(log_path_str: str, start: int, end: int) -> List[MemorySample]:
+    """进程池工作函数：解析单个字节块（每个工作进程打开自己的 mmap 视图）"""
+    with open(log_path_str, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ) as mm:
+            return _parse_log_range(mm, start, end)
+
+
+def _parse_log_parallel(log_path: Path, size: int) -> List[MemorySample]:
+    """多进程解析大日志文件。
+
+    将文件按字节均分为 N 块，把每个块边界对齐到下一个换行符，然后交给
+    进程池并行解析；JSON 解码是 CPU 密集的，行级解析可平凡并行，
+    在多核机器上接近线性加速。
+
+    Split the file into N byte chunks, snap each boundary to the next newline,
+    and parse the chunks in a process pool; JSON decoding is CPU-bound and
+    line parsing is trivially parallel, scaling near-linearly with cores.
+    """
+    workers = os.cpu_count() or 1
+
+    # 计算对齐到换行符的块边界
+    # Compute chunk boundaries snapped to newlines
+    boundaries = [0]
+    with open(log_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ) as mm:
+            for i in range(1, workers):
+                nominal = size * i // workers
+                if nominal <= boundaries[-1]:
+                    continue
+                newline = mm.find(b'\n', nominal)
+                boundary = size if newline == -1 else newline + 1
+                if boundary > boundaries[-1]:
+                    boundaries.append(boundary)
+    boundaries.append(size)
+
+    samples = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _parse_log_chunk_worker, str(log_path),
+                boundaries[i], boundaries[i + 1]
+            )
+            for i in range(len(boundaries) - 1)
+        ]
+        # 按块顺序合并结果，保持采样的时间顺序
+        # Merge results in chunk order to keep samples chronological
+        for future in futures:
+            samples.extend(future.result())
+
+    return samples
+
+
+def stream_log_samples(log_path: Path):
+    """逐条流式产出 memory_sample 记录，不物化完整列表。
+
+    供流式聚合路径使用：多日日志可能有数百万条采样，生成器让峰值内存
+    只取决于聚合状态而不是采样总数。
+
+    Used by the streaming-aggregation path: multi-day logs can hold millions of
+    samples, and the generator keeps peak memory proportional to the
+    aggregation state rather than the sample count.
+    """
+    size = log_path.stat().st_size
+    if size == 0:
+        return
+
+    with open(log_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ) as mm:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+
+            pos = 0
+            while pos < size:
+                line_end = mm.find(b'\n', pos)
+                if line_end == -1:
+                    line_end = size
+                sample = parse_log_line(mm[pos:line_end])
+                if sample:
+                    yield sample
+                pos = line_end + 1
+
+
+class StreamingAggregator:
+    """单遍流式聚合器。
+
+    在一次日志遍历中同时维护：
+    (a) 每小时的首/末采样，用于小时级增长统计
+    (b) 全程首/末采样与计数，用于摘要报告
+    (c) 均匀抽稀到固定容量的绘图缓冲
+
+    峰值内存为 O(小时数 + 绘图容量)，而不是 O(采样数)。
+
+    Maintains, in a single traversal of the log: per-hour first/last samples
+    for the hourly growth stats, the overall first/last sample and count for
+    the summary report, and a plot buffer uniformly decimated to a fixed
+    capacity. Peak memory is O(hours + plot capacity) instead of O(samples).
+    """
+
+    PLOT_CAPACITY = 4096
+
+    def __init__(self):
+        self.count = 0
+        self.first: Optional[MemorySample] = None
+        self.last: Optional[MemorySample] = None
+        self.hourly_stats: List[Dict] = []
+        self._hour = None
+        self._hour_first: Optional[MemorySample] = None
+        self._hour_last: Optional[MemorySample] = None
+        self._hour_count = 0
+        # 绘图缓冲：容量用满时隔点丢弃并把步长翻倍，保持均匀覆盖
+        # Plot buffer: when full, drop every other point and double the stride,
+        # keeping uniform coverage
+        self._plot_rows: List[tuple] = []
+        self._plot_stride = 1
+        self._seen = 0
+
+    def add(self, sample: MemorySample):
+        """合入一条采样记录"""
+        if self.first is None:
+            self.first = sample
+        self.last = sample
+        self.count += 1
+
+        hour = sample.time.replace(minute=0, second=0, microsecond=0)
+        if hour != self._hour:
+            self._flush_hour()
+            self._hour = hour
+            self._hour_first = sample
+            self._hour_count = 0
+        self._hour_last = sample
+        self._hour_count += 1
+
+        if self._seen % self._plot_stride == 0:
+            self._plot_rows.append(
+                (sample.time, sample.rss_mb, sample.heap_mb, sample.goroutines)
+            )
+            if len(self._plot_rows) >= self.PLOT_CAPACITY:
+                self._plot_rows = self._plot_rows[::2]
+                self._plot_stride *= 2
+        self._seen += 1
+
+    def _flush_hour(self):
+        """结算当前小时的增长统计（不足 2 个采样的小时跳过）"""
+        if self._hour is None or self._hour_count < 2:
+            return
+
+        first = self._hour_first
+        last = self._hour_last
+        self.hourly_stats.append({
+            'hour': self._hour,
+            'rss_start_mb': first.rss_mb,
+            'rss_end_mb': last.rss_mb,
+            'rss_growth_mb': last.rss_mb - first.rss_mb,
+            'rss_growth_percent': (
+                (last.rss_mb - first.rss_mb) / first.rss_mb * 100
+            ) if first.rss_mb > 0 else 0,
+            'heap_growth_mb': (
+                last.heap_alloc_bytes - first.heap_alloc_bytes
+            ) / 1024 / 1024,
+            'gc_growth': last.gc - first.gc,
+            'goroutines_growth': last.goroutines - first.goroutines,
+            'sample_count': self._hour_count,
+        })
+
+    def finalize(self) -> List[Dict]:
+        """结算最后一小时并返回全部小时级统计"""
+        self._flush_hour()
+        self._hour = None
+        return self.hourly_stats
+
+    def plot_series(self):
+        """返回抽稀后的绘图序列 (times, rss_mb, heap_mb, goroutines)"""
+        if not self._plot_rows:
+            return [], [], [], []
+        times, rss_mb, heap_mb, goroutines = zip(*self._plot_rows)
+        return list(times), list(rss_mb), list(heap_mb), list(goroutines)
+
+
 def parse_log_file(log_path: Path) -> List[MemorySample]:
     """从日志文件中提取所有 memory_sample 记录"""
-    samples = []
-    
     if not log_path.exists():
         print(f"错误: 日志文件不存在: {log_path}", file=sys.stderr)
-        return samples
-    
+        return []
+
     print(f"正在解析日志文件: {log_path}")
-    
-    with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-        for line_num, line in enumerate(f, 1):
-            sample = parse_log_line(line)
-            if sample:
-                samples.append(sample)
-    
+
+    size = log_path.stat().st_size
+    if size >= PARALLEL_THRESHOLD_BYTES and (os.cpu_count() or 1) > 1:
+        samples = _parse_log_parallel(log_path, size)
+    elif HAS_HYPERSCAN:
+        samples = _parse_log_hyperscan(log_path)
+    else:
+        samples = _parse_log_lines(log_path)
+
     print(f"提取到 {len(samples)} 条内存采样记录")
     return samples
 
 
+def samples_to_arrays(samples: List[MemorySample]) -> Dict:
+    """将采样对象列表转换为列式（SoA）NumPy 数组。
+
+    逐对象的 Python 属性访问（AoS）每字段一次字典查找、每对象约 200 字节开销；
+    转换为连续的类型化数组后，聚合可以走 NumPy 的 C 循环并且对缓存友好。
+
+    Per-object Python attribute access (AoS) costs one dict lookup per field and
+    ~200 bytes per object; once converted to contiguous typed arrays, the
+    aggregation runs in NumPy's C loops and is cache-friendly.
+    """
+    # 时间戳批量转换：一次 C 级解析生成每行 8 字节的连续 datetime64 列，
+    # 替代逐条的 Python datetime 解析
+    # Batch timestamp conversion: one C-level parse produces the contiguous
+    # 8-byte-per-row datetime64 column instead of per-record Python datetime
+    # parsing
+    try:
+        with warnings.catch_warnings():
+            # numpy 对带时区偏移的 ISO 字符串会发 DeprecationWarning（按 UTC 解析，
+            # 与 datetime.timestamp() 的语义一致）
+            # numpy warns on ISO strings with a timezone offset (it parses them
+            # as UTC, matching datetime.timestamp() semantics)
+            warnings.simplefilter('ignore', DeprecationWarning)
+            times = np.array(
+                [
+                    s.time_raw[:-1] + '+00:00'
+                    if s.time_raw.endswith('Z') else s.time_raw
+                    for s in samples
+                ],
+                dtype='datetime64[us]'
+            )
+    except (ValueError, TypeError):
+        # 个别时间戳格式 numpy 无法解析时退回逐条解析
+        # Fall back to per-record parsing when numpy cannot handle the format
+        times = np.array(
+            [int(s.time.timestamp() * 1_000_000) for s in samples],
+            dtype=np.int64
+        ).view('datetime64[us]')
+
+    return {
+        'time': times,
+        'rss_mb': np.array([s.rss_mb for s in samples], dtype=np.int64),
+        'rss_bytes': np.array([s.rss_bytes for s in samples], dtype=np.int64),
+        'heap_mb': np.array([s.heap_mb for s in samples], dtype=np.float64),
+        'heap_alloc_bytes': np.array(
+            [s.heap_alloc_bytes for s in samples], dtype=np.int64
+        ),
+        'heap_inuse_bytes': np.array(
+            [s.heap_inuse_bytes for s in samples], dtype=np.int64
+        ),
+        'gc': np.array([s.gc for s in samples], dtype=np.int64),
+        'goroutines': np.array([s.goroutines for s in samples], dtype=np.int64),
+        'module_count': np.array([len(s.modules) for s in samples], dtype=np.int64),
+    }
+
+
 def calculate_hourly_growth(samples: List[MemorySample]) -> List[Dict]:
     """计算每小时的内存增长"""
     if len(samples) < 2:
         return []
-    
+
+    if HAS_PANDAS and HAS_NUMPY:
+        return _calculate_hourly_growth_pandas(samples)
+    if HAS_NUMPY:
+        return _calculate_hourly_growth_np(samples)
+    return _calculate_hourly_growth_py(samples)
+
+
+def _calculate_hourly_growth_pandas(samples: List[MemorySample]) -> List[Dict]:
+    """计算每小时的内存增长（pandas groupby 实现）。
+
+    groupby + first/last 归约在 pandas 的 C 循环中完成，逐小时的差值
+    是列级的向量化减法，没有任何逐采样的 Python 分支。
+
+    The groupby + first/last reductions run in pandas' C loops, and the
+    per-hour deltas are column-level vectorized subtractions with no
+    per-sample Python branching.
+    """
+    df = pd.DataFrame(samples_to_arrays(samples))
+
+    # 按向小时取整的时间分组；采样本身按时间有序，组内首尾即该小时的起止
+    # Group by the hour-floored time; samples are chronological, so each
+    # group's first/last rows are the hour's start and end
+    grouped = df.groupby(df['time'].dt.floor('h'), sort=True)
+    first = grouped.first()
+    last = grouped.last()
+    counts = grouped.size()
+
+    # 只保留至少有 2 个采样的小时
+    # Keep only hours with at least 2 samples
+    mask = counts >= 2
+    first = first[mask]
+    last = last[mask]
+    counts = counts[mask]
+
+    rss_growth = last['rss_mb'] - first['rss_mb']
+    rss_growth_percent = (
+        rss_growth / first['rss_mb'].where(first['rss_mb'] > 0) * 100
+    ).fillna(0)
+    heap_growth_mb = (
+        last['heap_alloc_bytes'] - first['heap_alloc_bytes']
+    ) / 1024 / 1024
+    gc_growth = last['gc'] - first['gc']
+    goroutines_growth = last['goroutines'] - first['goroutines']
+
+    hourly_stats = []
+    for hour in first.index:
+        hourly_stats.append({
+            'hour': hour.to_pydatetime(),
+            'rss_start_mb': int(first.at[hour, 'rss_mb']),
+            'rss_end_mb': int(last.at[hour, 'rss_mb']),
+            'rss_growth_mb': int(rss_growth[hour]),
+            'rss_growth_percent': float(rss_growth_percent[hour]),
+            'heap_growth_mb': float(heap_growth_mb[hour]),
+            'gc_growth': int(gc_growth[hour]),
+            'goroutines_growth': int(goroutines_growth[hour]),
+            'sample_count': int(counts[hour]),
+        })
+
+    return hourly_stats
+
+
+def _calculate_hourly_growth_np(samples: List[MemorySample]) -> List[Dict]:
+    """计算每小时的内存增长（pandas 不可用时的 NumPy 实现）"""
+    arrays = samples_to_arrays(samples)
+
+    # 向小时取整后用一次 np.unique 找到所有小时边界（采样按时间有序，
+    # return_index 给出每小时的首个下标，加上计数得到末尾下标）
+    # Floor to the hour and find all hour boundaries with a single np.unique
+    # (samples are chronological; return_index yields each hour's first index,
+    # adding the count gives the last index)
+    hours = arrays['time'].astype('datetime64[h]')
+    uniq_hours, first_idx, counts = np.unique(
+        hours, return_index=True, return_counts=True
+    )
+    last_idx = first_idx + counts - 1
+
+    # 每小时的增量通过向量化的首尾差值一次算出，替代逐采样的 Python 循环
+    # Per-hour deltas come from one vectorized first/last subtraction instead of
+    # the per-sample Python loop
+    rss_first = arrays['rss_mb'][first_idx]
+    rss_last = arrays['rss_mb'][last_idx]
+    rss_growth = rss_last - rss_first
+    heap_growth_mb = (
+        arrays['heap_alloc_bytes'][last_idx] - arrays['heap_alloc_bytes'][first_idx]
+    ) / 1024 / 1024
+    gc_growth = arrays['gc'][last_idx] - arrays['gc'][first_idx]
+    goroutines_growth = (
+        arrays['goroutines'][last_idx] - arrays['goroutines'][first_idx]
+    )
+
+    hourly_stats = []
+    for i in range(len(uniq_hours)):
+        if counts[i] < 2:
+            continue
+        hourly_stats.append({
+            'hour': uniq_hours[i].astype('datetime64[s]').item(),
+            'rss_start_mb': int(rss_first[i]),
+            'rss_end_mb': int(rss_last[i]),
+            'rss_growth_mb': int(rss_growth[i]),
+            'rss_growth_percent': (
+                float(rss_growth[i]) / float(rss_first[i]) * 100
+            ) if rss_first[i] > 0 else 0,
+            'heap_growth_mb': float(heap_growth_mb[i]),
+            'gc_growth': int(gc_growth[i]),
+            'goroutines_growth': int(goroutines_growth[i]),
+            'sample_count': int(counts[i]),
+        })
+
+    return hourly_stats
+
+
+def _calculate_hourly_growth_py(samples: List[MemorySample]) -> List[Dict]:
+    """计算每小时的内存增长（numpy 不可用时的纯 Python 回退实现）"""
     hourly_stats = []
     current_hour_start = samples[0].time.replace(minute=0, second=0, microsecond=0)
     hour_samples = []
@@ -164,62 +727,114 @@ def calculate_hourly_growth(samples: List[MemorySample]) -> List[Dict]:
     return hourly_stats
 
 
+# CSV 列名：pandas 路径和 csv.writer 回退路径共用
+# CSV column names: shared by the pandas path and the csv.writer fallback
+CSV_COLUMNS = [
+    '时间', 'RSS(MB)', 'RSS(Bytes)', 'Heap(MB)', 'HeapAlloc(Bytes)',
+    'HeapInuse(Bytes)', 'GC次数', 'Goroutines', '模块数'
+]
+
+
 def generate_csv_report(samples: List[MemorySample], output_path: Path):
     """生成 CSV 报告"""
-    import csv
-    
-    with open(output_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        
-        # 写入表头
-        writer.writerow([
-            '时间', 'RSS(MB)', 'RSS(Bytes)', 'Heap(MB)', 'HeapAlloc(Bytes)',
-            'HeapInuse(Bytes)', 'GC次数', 'Goroutines', '模块数'
-        ])
-        
-        # 写入数据
-        for sample in samples:
-            writer.writerow([
-                sample.time.isoformat(),
-                sample.rss_mb,
-                sample.rss_bytes,
-                sample.heap_mb,
-                sample.heap_alloc_bytes,
-                sample.heap_inuse_bytes,
-                sample.gc,
-                sample.goroutines,
-                len(sample.modules),
-            ])
-    
+    if HAS_PANDAS and HAS_NUMPY:
+        # to_csv 在 pandas 的 C 写出器中批量格式化整列，
+        # 避免逐行跨越 Python/C 边界和逐字段的属性访问
+        # to_csv batch-formats whole columns in pandas' C writer, avoiding a
+        # Python/C crossing per row and per-field attribute lookups
+        df = pd.DataFrame(samples_to_arrays(samples))
+        df.columns = CSV_COLUMNS
+        # 显式的 Z 后缀标明时间列是 UTC（三条 CSV 路径输出同一格式）
+        # The explicit Z suffix marks the time column as UTC (all three CSV
+        # paths emit the same format)
+        df.to_csv(
+            output_path,
+            index=False,
+            encoding='utf-8',
+            date_format='%Y-%m-%dT%H:%M:%SZ'
+        )
+    elif HAS_NUMPY:
+        # 无 pandas 有 numpy：时间列用 datetime_as_string 一次性批量格式化
+        # （C 级 ISO 输出），数据行整批交给 writerows，而不是逐行调用
+        # isoformat() 再逐行写出
+        # No pandas but numpy available: the time column is batch-formatted in
+        # one datetime_as_string call (C-level ISO output) and the rows go to
+        # writerows as a single batch instead of per-row isoformat() + writerow
+        cols = samples_to_arrays(samples)
+        # timezone='UTC' 追加 Z 后缀，与 pandas 路径的输出格式一致
+        # timezone='UTC' appends the Z suffix, matching the pandas path
+        timestamps = np.datetime_as_string(cols['time'], unit='s', timezone='UTC')
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            writer.writerows(zip(
+                timestamps,
+                cols['rss_mb'],
+                cols['rss_bytes'],
+                cols['heap_mb'],
+                cols['heap_alloc_bytes'],
+                cols['heap_inuse_bytes'],
+                cols['gc'],
+                cols['goroutines'],
+                cols['module_count'],
+            ))
+    else:
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+
+            # 写入表头
+            writer.writerow(CSV_COLUMNS)
+
+            # 写入数据
+            for sample in samples:
+                writer.writerow([
+                    # UTC + Z 后缀，与 pandas / numpy 路径格式一致
+                    # UTC with Z suffix, matching the pandas/numpy paths
+                    sample.time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    sample.rss_mb,
+                    sample.rss_bytes,
+                    sample.heap_mb,
+                    sample.heap_alloc_bytes,
+                    sample.heap_inuse_bytes,
+                    sample.gc,
+                    sample.goroutines,
+                    len(sample.modules),
+                ])
+
     print(f"CSV 报告已生成: {output_path}")
 
 
-def generate_summary_report(samples: List[MemorySample], hourly_stats: List[Dict], output_path: Optional[Path] = None):
-    """生成文本摘要报告"""
-    if len(samples) < 2:
+def generate_summary_report(first: MemorySample, last: MemorySample, count: int,
+                            hourly_stats: List[Dict], output_path: Optional[Path] = None):
+    """生成文本摘要报告。
+
+    只依赖首/末采样和计数，因此批量路径和流式聚合路径可以共用。
+
+    Depends only on the first/last samples and the count, so both the batch
+    path and the streaming-aggregation path can use it.
+    """
+    if count < 2:
         print("警告: 采样数据不足，无法生成报告")
         return
-    
-    first = samples[0]
-    last = samples[-1]
+
     duration = (last.time - first.time).total_seconds() / 3600  # 小时
-    
+
     rss_growth = last.rss_mb - first.rss_mb
     rss_growth_percent = (rss_growth / first.rss_mb * 100) if first.rss_mb > 0 else 0
     rss_growth_per_hour = rss_growth / duration if duration > 0 else 0
-    
+
     heap_growth_mb = (last.heap_alloc_bytes - first.heap_alloc_bytes) / 1024 / 1024
     gc_growth = last.gc - first.gc
     goroutines_growth = last.goroutines - first.goroutines
-    
+
     report_lines = [
         "=" * 60,
         "内存测试分析报告",
         "=" * 60,
         "",
         f"测试时长: {duration:.2f} 小时",
-        f"采样次数: {len(samples)}",
-        f"采样间隔: {duration * 3600 / len(samples):.1f} 秒",
+        f"采样次数: {count}",
+        f"采样间隔: {duration * 3600 / count:.1f} 秒",
         "",
         "【总体变化】",
         f"  RSS: {first.rss_mb} MB → {last.rss_mb} MB (增长: {rss_growth:+d} MB, {rss_growth_percent:+.2f}%)",
@@ -255,9 +870,14 @@ def generate_summary_report(samples: List[MemorySample], hourly_stats: List[Dict
             f"{'时间':<20} {'RSS起始':<12} {'RSS结束':<12} {'增长(MB)':<12} {'增长(%)':<10} {'GC增长':<10} {'Goroutines增长':<15}",
             "-" * 100,
         ])
-        
-        for stat in hourly_stats:
-            report_lines.append(
+
+        # 整张表用一次 map + join 批量构建，替代数千小时级别运行时的逐行
+        # list.append（一次 C 级 join 对数千次 Python 追加）
+        # The whole table is built in one map + join batch instead of a
+        # per-row list.append — one C-level join versus thousands of Python
+        # appends for multi-thousand-hour runs
+        def format_hour(stat: Dict) -> str:
+            return (
                 f"{stat['hour'].strftime('%Y-%m-%d %H:00'):<20} "
                 f"{stat['rss_start_mb']:<12} "
                 f"{stat['rss_end_mb']:<12} "
@@ -266,7 +886,8 @@ def generate_summary_report(samples: List[MemorySample], hourly_stats: List[Dict
                 f"{stat['gc_growth']:+10} "
                 f"{stat['goroutines_growth']:+15}"
             )
-        
+
+        report_lines.append("\n".join(map(format_hour, hourly_stats)))
         report_lines.append("")
     
     report_lines.append("=" * 60)
@@ -281,38 +902,112 @@ def generate_summary_report(samples: List[MemorySample], hourly_stats: List[Dict
         print(report_text)
 
 
-def plot_memory_trend(samples: List[MemorySample], output_path: Path):
-    """生成内存趋势图"""
+# 超过该点数的序列在绘图前先做 LTTB 下采样
+# Series longer than this are LTTB-downsampled before plotting
+LTTB_THRESHOLD = 2000
+
+
+def lttb_indices(x: "np.ndarray", y: "np.ndarray", threshold: int) -> "np.ndarray":
+    """Largest-Triangle-Three-Buckets 下采样，返回保留点的下标。
+
+    每个桶保留与前一保留点和下一桶均值构成三角形面积最大的点，
+    在大幅减少点数的同时保持曲线的视觉特征。
+
+    Each bucket keeps the point forming the largest triangle with the
+    previously kept point and the next bucket's average, preserving the
+    curve's visual features while drastically cutting the point count.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+    every = (n - 2) / (threshold - 2)
+
+    a = 0
+    for i in range(threshold - 2):
+        bucket_start = int(i * every) + 1
+        bucket_end = int((i + 1) * every) + 1
+        avg_start = bucket_end
+        avg_end = min(int((i + 2) * every) + 1, n)
+
+        if avg_end > avg_start:
+            avg_x = x[avg_start:avg_end].mean()
+            avg_y = y[avg_start:avg_end].mean()
+        else:
+            avg_x = x[-1]
+            avg_y = y[-1]
+
+        seg_x = x[bucket_start:bucket_end]
+        seg_y = y[bucket_start:bucket_end]
+        # 三角形面积（省略 1/2 系数，不影响 argmax）
+        # Triangle area (the 1/2 factor is dropped; it does not affect argmax)
+        area = np.abs(
+            (x[a] - avg_x) * (seg_y - y[a]) - (x[a] - seg_x) * (avg_y - y[a])
+        )
+        a = bucket_start + int(np.argmax(area))
+        kept[i + 1] = a
+
+    return kept
+
+
+def plot_memory_trend(times, rss_mb, heap_mb, goroutines, output_path: Path):
+    """生成内存趋势图。
+
+    接受已就绪的序列而不是采样对象列表，批量路径和流式聚合路径
+    （抽稀后的缓冲）都可以直接传入。
+
+    Accepts ready series rather than a list of sample objects, so both the
+    batch path and the streaming path (its decimated buffer) can feed it.
+    """
     if not HAS_MATPLOTLIB:
         print("警告: matplotlib 未安装，跳过图表生成")
         return
-    
-    if len(samples) < 2:
+
+    if len(times) < 2:
         print("警告: 采样数据不足，无法生成图表")
         return
-    
-    times = [s.time for s in samples]
-    rss_mb = [s.rss_mb for s in samples]
-    heap_mb = [s.heap_mb for s in samples]
-    goroutines = [s.goroutines for s in samples]
-    
+
+    # matplotlib 的 Agg 渲染是 O(点数)：长序列先用 LTTB 压到视觉上
+    # 无损的点数，渲染时间随之按比例缩短
+    # matplotlib's Agg rendering is O(points): long series are first reduced by
+    # LTTB to a visually lossless point count, shrinking render time
+    # proportionally
+    if HAS_NUMPY and len(times) > LTTB_THRESHOLD:
+        x_seconds = np.array([t.timestamp() for t in times])
+
+        def downsample(values):
+            idx = lttb_indices(
+                x_seconds, np.asarray(values, dtype=np.float64), LTTB_THRESHOLD
+            )
+            return [times[i] for i in idx], [values[i] for i in idx]
+    else:
+        def downsample(values):
+            return times, values
+
+    plt.rcParams['path.simplify_threshold'] = 1.0
     fig, axes = plt.subplots(3, 1, figsize=(12, 10))
-    
+
     # RSS 趋势
-    axes[0].plot(times, rss_mb, 'b-', linewidth=1.5, label='RSS (MB)')
+    t_rss, rss_ds = downsample(rss_mb)
+    axes[0].plot(t_rss, rss_ds, 'b-', linewidth=1.5, label='RSS (MB)')
     axes[0].set_ylabel('RSS (MB)', fontsize=10)
     axes[0].set_title('内存趋势分析', fontsize=12, fontweight='bold')
     axes[0].grid(True, alpha=0.3)
     axes[0].legend()
-    
+
     # Heap 趋势
-    axes[1].plot(times, heap_mb, 'g-', linewidth=1.5, label='Heap (MB)')
+    t_heap, heap_ds = downsample(heap_mb)
+    axes[1].plot(t_heap, heap_ds, 'g-', linewidth=1.5, label='Heap (MB)')
     axes[1].set_ylabel('Heap (MB)', fontsize=10)
     axes[1].grid(True, alpha=0.3)
     axes[1].legend()
-    
+
     # Goroutines 趋势
-    axes[2].plot(times, goroutines, 'r-', linewidth=1.5, label='Goroutines')
+    t_goroutines, goroutines_ds = downsample(goroutines)
+    axes[2].plot(t_goroutines, goroutines_ds, 'r-', linewidth=1.5, label='Goroutines')
     axes[2].set_ylabel('Goroutines', fontsize=10)
     axes[2].set_xlabel('时间', fontsize=10)
     axes[2].grid(True, alpha=0.3)
@@ -340,8 +1035,7 @@ def main():
     parser.add_argument(
         '--output',
         type=Path,
-        required=True,
-        help='CSV 输出文件路径'
+        help='CSV 输出文件路径（可选；省略时使用流式聚合，不在内存中物化全部采样）'
     )
     
     parser.add_argument(
@@ -363,29 +1057,59 @@ def main():
     )
     
     args = parser.parse_args()
-    
-    # 解析日志
-    samples = parse_log_file(args.log)
-    
-    if not samples:
-        print("错误: 未找到任何 memory_sample 记录", file=sys.stderr)
-        sys.exit(1)
-    
-    # 生成 CSV 报告
-    generate_csv_report(samples, args.output)
-    
-    # 计算每小时增长
-    hourly_stats = calculate_hourly_growth(samples)
-    
-    # 生成摘要报告
-    if args.summary:
-        generate_summary_report(samples, hourly_stats, args.summary)
+
+    if args.output:
+        # 批量路径：CSV 报告需要全部采样，物化列表后走向量化聚合
+        # Batch path: the CSV report needs every sample, so materialize the list
+        # and use the vectorized aggregation
+        samples = parse_log_file(args.log)
+
+        if not samples:
+            print("错误: 未找到任何 memory_sample 记录", file=sys.stderr)
+            sys.exit(1)
+
+        # 生成 CSV 报告
+        generate_csv_report(samples, args.output)
+
+        # 计算每小时增长
+        hourly_stats = calculate_hourly_growth(samples)
+
+        first, last, count = samples[0], samples[-1], len(samples)
+        plot_series = (
+            [s.time for s in samples],
+            [s.rss_mb for s in samples],
+            [s.heap_mb for s in samples],
+            [s.goroutines for s in samples],
+        )
     else:
-        generate_summary_report(samples, hourly_stats)
-    
+        # 流式路径：单遍扫描中同时完成小时聚合、摘要统计和绘图抽稀，
+        # 峰值内存与采样总数无关
+        # Streaming path: hourly aggregation, summary stats and plot decimation
+        # happen in one sweep; peak memory is independent of the sample count
+        if not args.log.exists():
+            print(f"错误: 日志文件不存在: {args.log}", file=sys.stderr)
+            sys.exit(1)
+
+        print(f"正在解析日志文件: {args.log}")
+        aggregator = StreamingAggregator()
+        for sample in stream_log_samples(args.log):
+            aggregator.add(sample)
+        print(f"提取到 {aggregator.count} 条内存采样记录")
+
+        if aggregator.count == 0:
+            print("错误: 未找到任何 memory_sample 记录", file=sys.stderr)
+            sys.exit(1)
+
+        hourly_stats = aggregator.finalize()
+        first, last, count = aggregator.first, aggregator.last, aggregator.count
+        plot_series = aggregator.plot_series()
+
+    # 生成摘要报告
+    generate_summary_report(first, last, count, hourly_stats, args.summary)
+
     # 生成趋势图
     if args.plot and not args.no_plot:
-        plot_memory_trend(samples, args.plot)
+        plot_memory_trend(*plot_series, args.plot)
 
 
 if __name__ == '__main__':
@@ -10,20 +10,64 @@ WES 内存问题分析工具
 4. 生成诊断报告
 """
 
+import argparse
 import json
 import sys
+import time
 import urllib.request
 import urllib.error
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+try:
+    # httpx 支持连接保活和 gzip 压缩：保活摊销 TCP/TLS 建连成本（--watch 模式
+    # 下复用同一连接），gzip 将 JSON 传输字节数缩小约 10 倍
+    # httpx supports keepalive and gzip: keepalive amortizes TCP/TLS setup
+    # (reusing one connection in --watch mode) and gzip shrinks the JSON
+    # transfer ~10x
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+try:
+    # pandas 将每模块分析从 Python 循环移到 C：一次排序、一次求和、
+    # 阈值比较全部向量化，模块数上千时收益明显
+    # pandas moves the per-module analysis from Python loops into C: one sort,
+    # one sum, all threshold checks vectorized — a clear win with thousands of
+    # modules
+    import pandas as pd
+    HAS_PANDAS = True
+except ImportError:
+    HAS_PANDAS = False
 
 # 配置
 DEFAULT_API_URL = "http://localhost:28680"
 MEMORY_ENDPOINT = "/api/v1/system/memory"
 
 
-def fetch_memory_data(api_url: str) -> Dict[str, Any]:
+def make_client() -> Optional["httpx.Client"]:
+    """创建可复用的 HTTP 客户端（httpx 不可用时返回 None）"""
+    if not HAS_HTTPX:
+        return None
+    return httpx.Client(timeout=5, headers={'Accept-Encoding': 'gzip'})
+
+
+def fetch_memory_data(api_url: str, client: Optional["httpx.Client"] = None) -> Dict[str, Any]:
     """获取内存监控数据"""
     url = f"{api_url}{MEMORY_ENDPOINT}"
+
+    if client is not None:
+        try:
+            response = client.get(url)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            print(f"❌ 无法连接到节点: {e}")
+            print(f"   请确保节点正在运行，并可通过 {api_url} 访问")
+            sys.exit(1)
+
+    # urllib 回退：httpx 未安装时使用（每次请求重新建连）
+    # urllib fallback: used when httpx is not installed (reconnects per request)
     try:
         with urllib.request.urlopen(url, timeout=5) as response:
             return json.loads(response.read().decode())
@@ -36,51 +80,105 @@ def fetch_memory_data(api_url: str) -> Dict[str, Any]:
         sys.exit(1)
 
 
+BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+
 def format_bytes(bytes_value: int) -> str:
-    """格式化字节数为可读格式"""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if bytes_value < 1024.0:
-            return f"{bytes_value:.2f} {unit}"
-        bytes_value /= 1024.0
-    return f"{bytes_value:.2f} TB"
+    """格式化字节数为可读格式。
 
+    用 bit_length() // 10 直接算出单位下标，替代逐级除 1024 的循环：
+    整数路径无分支，批量调用时不会反复改写参数。
 
-def analyze_memory(data: Dict[str, Any]) -> None:
-    """分析内存使用情况"""
-    runtime = data.get('runtime', {})
-    modules = data.get('modules', [])
-    
-    # 显示运行时统计
-    print("=" * 100)
-    print("运行时内存统计")
-    print("=" * 100)
-    heap_alloc = runtime.get('heap_alloc', 0)
-    heap_inuse = runtime.get('heap_inuse', 0)
-    num_gc = runtime.get('num_gc', 0)
-    num_goroutine = runtime.get('num_goroutine', 0)
-    
-    print(f"堆分配:     {format_bytes(heap_alloc)} ({heap_alloc:,} bytes)")
-    print(f"堆使用:     {format_bytes(heap_inuse)} ({heap_inuse:,} bytes)")
-    print(f"GC 次数:    {num_gc:,}")
-    print(f"Goroutine:  {num_goroutine:,}")
+    Computes the unit index directly via bit_length() // 10 instead of the
+    divide-by-1024 loop: a branchless integer path that no longer mutates the
+    argument when called in bulk.
+    """
+    i = min((max(int(bytes_value), 1).bit_length() - 1) // 10, len(BYTE_UNITS) - 1)
+    return f"{bytes_value / (1 << (10 * i)):.2f} {BYTE_UNITS[i]}"
+
+
+# 模块统计的默认值：缺失字段统一按此补齐
+# Defaults for module stats: missing fields are filled from this table
+MODULE_DEFAULTS = {
+    'module': 'unknown',
+    'layer': 'unknown',
+    'objects': 0,
+    'approx_bytes': 0,
+    'cache_items': 0,
+    'queue_length': 0,
+}
+
+# 异常阈值（与原循环判断保持一致）
+# Anomaly thresholds (identical to the original loop checks)
+MEMORY_ISSUE_BYTES = 100 * 1024 * 1024
+OBJECTS_WARN = 100000
+QUEUE_WARN = 10000
+CACHE_WARN = 100000
+
+
+def _analyze_modules_pandas(modules: List[Dict[str, Any]]):
+    """向量化的模块分析：单次排序 + 向量化阈值掩码。
+
+    Vectorized module analysis: one sort plus vectorized threshold masks.
+    """
+    df = pd.DataFrame(modules)
+    for col, default in MODULE_DEFAULTS.items():
+        if col not in df.columns:
+            df[col] = default
+    df = df.fillna(MODULE_DEFAULTS)
+    # 单次排序替代 Python 的 sorted + lambda 取值
+    # A single sort replaces Python's sorted with a lambda getter
+    df = df.sort_values('approx_bytes', ascending=False)
+
+    print(f"{'模块':<30} {'层级':<20} {'对象数':<15} {'内存':<15} {'缓存':<12} {'队列':<12}")
+    print("-" * 100)
+    print(df[['module', 'layer', 'objects', 'approx_bytes', 'cache_items', 'queue_length']].to_string(
+        index=False,
+        header=False,
+        formatters={
+            'module': '{:<30}'.format,
+            'layer': '{:<20}'.format,
+            'objects': '{:<15,}'.format,
+            'approx_bytes': lambda v: f"{format_bytes(v):<15}",
+            'cache_items': '{:<12,}'.format,
+            'queue_length': '{:<12,}'.format,
+        },
+    ))
+    print("-" * 100)
+    # 总量是一次 C 级求和，而不是 Python 循环累加
+    # The total is one C-level sum instead of Python-loop accumulation
+    total_bytes = int(df['approx_bytes'].sum())
+    print(f"{'总计':<30} {'':<20} {'':<15} {format_bytes(total_bytes):<15} {'':<12} {'':<12}")
     print()
-    
-    if not modules:
-        print("⚠️  未找到模块统计数据")
-        print("   可能原因：")
-        print("     1. 节点刚启动，MemoryDoctor 尚未采样")
-        print("     2. 模块未正确注册 MemoryReporter")
-        return
-    
+
+    # 阈值判断：向量化掩码筛出异常行，只对命中的行构造消息
+    # Threshold checks: vectorized masks select anomalous rows, messages are
+    # built only for the hits
+    issues = [
+        f"⚠️  {row.module}: 内存使用较高 ({row.approx_bytes / 1024 / 1024:.2f} MB)"
+        for row in df[df['approx_bytes'] > MEMORY_ISSUE_BYTES].itertuples()
+    ]
+    warnings = []
+    for row in df[df['objects'] > OBJECTS_WARN].itertuples():
+        warnings.append(f"⚠️  {row.module}: 对象数量异常 ({row.objects:,})")
+    for row in df[df['queue_length'] > QUEUE_WARN].itertuples():
+        warnings.append(f"⚠️  {row.module}: 队列长度异常 ({row.queue_length:,})")
+    for row in df[df['cache_items'] > CACHE_WARN].itertuples():
+        warnings.append(f"⚠️  {row.module}: 缓存条目异常 ({row.cache_items:,})")
+    return issues, warnings
+
+
+def _analyze_modules_py(modules: List[Dict[str, Any]]):
+    """纯 Python 回退：pandas 不可用时保留原始循环实现。
+
+    Pure-Python fallback: keeps the original loop when pandas is unavailable.
+    """
     # 按内存使用排序
     sorted_modules = sorted(modules, key=lambda x: x.get('approx_bytes', 0), reverse=True)
-    
-    print("=" * 100)
-    print("模块内存使用排名（按 approx_bytes 降序）")
-    print("=" * 100)
+
     print(f"{'模块':<30} {'层级':<20} {'对象数':<15} {'内存':<15} {'缓存':<12} {'队列':<12}")
     print("-" * 100)
-    
+
     total_memory = 0
     for mod in sorted_modules:
         module_name = mod.get('module', 'unknown')
@@ -89,25 +187,20 @@ def analyze_memory(data: Dict[str, Any]) -> None:
         approx_bytes = mod.get('approx_bytes', 0)
         cache_items = mod.get('cache_items', 0)
         queue_length = mod.get('queue_length', 0)
-        
+
         memory_mb = approx_bytes / 1024 / 1024
         total_memory += memory_mb
-        
+
         print(f"{module_name:<30} {layer:<20} {objects:<15,} {format_bytes(approx_bytes):<15} "
               f"{cache_items:<12,} {queue_length:<12,}")
-    
+
     print("-" * 100)
     print(f"{'总计':<30} {'':<20} {'':<15} {format_bytes(int(total_memory * 1024 * 1024)):<15} {'':<12} {'':<12}")
     print()
-    
-    # 识别潜在问题
-    print("=" * 100)
-    print("🔍 潜在问题分析")
-    print("=" * 100)
-    
+
     issues = []
     warnings = []
-    
+
     for mod in sorted_modules:
         module_name = mod.get('module', 'unknown')
         objects = mod.get('objects', 0)
@@ -115,23 +208,68 @@ def analyze_memory(data: Dict[str, Any]) -> None:
         cache_items = mod.get('cache_items', 0)
         queue_length = mod.get('queue_length', 0)
         memory_mb = approx_bytes / 1024 / 1024
-        
+
         # 检查内存使用超过 100MB 的模块
         if memory_mb > 100:
             issues.append(f"⚠️  {module_name}: 内存使用较高 ({memory_mb:.2f} MB)")
-        
+
         # 检查对象数量异常
-        if objects > 100000:
+        if objects > OBJECTS_WARN:
             warnings.append(f"⚠️  {module_name}: 对象数量异常 ({objects:,})")
-        
+
         # 检查队列长度异常
-        if queue_length > 10000:
+        if queue_length > QUEUE_WARN:
             warnings.append(f"⚠️  {module_name}: 队列长度异常 ({queue_length:,})")
-        
+
         # 检查缓存条目异常
-        if cache_items > 100000:
+        if cache_items > CACHE_WARN:
             warnings.append(f"⚠️  {module_name}: 缓存条目异常 ({cache_items:,})")
-    
+    return issues, warnings
+
+
+def analyze_memory(data: Dict[str, Any]) -> None:
+    """分析内存使用情况"""
+    runtime = data.get('runtime', {})
+    modules = data.get('modules', [])
+
+    # 显示运行时统计
+    print("=" * 100)
+    print("运行时内存统计")
+    print("=" * 100)
+    heap_alloc = runtime.get('heap_alloc', 0)
+    heap_inuse = runtime.get('heap_inuse', 0)
+    num_gc = runtime.get('num_gc', 0)
+    num_goroutine = runtime.get('num_goroutine', 0)
+
+    print(f"堆分配:     {format_bytes(heap_alloc)} ({heap_alloc:,} bytes)")
+    print(f"堆使用:     {format_bytes(heap_inuse)} ({heap_inuse:,} bytes)")
+    print(f"GC 次数:    {num_gc:,}")
+    print(f"Goroutine:  {num_goroutine:,}")
+    print()
+
+    if not modules:
+        print("⚠️  未找到模块统计数据")
+        print("   可能原因：")
+        print("     1. 节点刚启动，MemoryDoctor 尚未采样")
+        print("     2. 模块未正确注册 MemoryReporter")
+        return
+
+    print("=" * 100)
+    print("模块内存使用排名（按 approx_bytes 降序）")
+    print("=" * 100)
+
+    # pandas 可用时走向量化路径，否则回退到原始循环
+    # Vectorized path when pandas is available, original loop otherwise
+    if HAS_PANDAS:
+        issues, warnings = _analyze_modules_pandas(modules)
+    else:
+        issues, warnings = _analyze_modules_py(modules)
+
+    # 识别潜在问题
+    print("=" * 100)
+    print("🔍 潜在问题分析")
+    print("=" * 100)
+
     if issues:
         print("🚨 发现的问题：")
         for issue in issues:
@@ -162,23 +300,51 @@ def analyze_memory(data: Dict[str, Any]) -> None:
 
 def main():
     """主函数"""
-    api_url = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_API_URL
-    
+    parser = argparse.ArgumentParser(description='WES 内存问题分析工具')
+    parser.add_argument(
+        'api_url',
+        nargs='?',
+        default=DEFAULT_API_URL,
+        help=f'节点 API 地址（默认: {DEFAULT_API_URL}）'
+    )
+    parser.add_argument(
+        '--watch',
+        type=int,
+        metavar='SECONDS',
+        help='周期性采样模式：每隔指定秒数重新采样（单个保活连接复用于所有请求）'
+    )
+    args = parser.parse_args()
+
     print("=" * 100)
     print("WES 内存问题分析工具")
     print("=" * 100)
     print()
-    print(f"节点地址: {api_url}")
+    print(f"节点地址: {args.api_url}")
     print()
-    
-    # 获取内存数据
-    print("正在获取内存监控数据...")
-    data = fetch_memory_data(api_url)
-    print("✅ 数据获取成功")
-    print()
-    
-    # 分析内存
-    analyze_memory(data)
+
+    # 单个客户端服务所有请求：--watch 模式下保活连接摊销建连成本
+    # One client serves every request: in --watch mode the keepalive connection
+    # amortizes the setup cost
+    client = make_client()
+    try:
+        while True:
+            # 获取内存数据
+            print("正在获取内存监控数据...")
+            data = fetch_memory_data(args.api_url, client)
+            print("✅ 数据获取成功")
+            print()
+
+            # 分析内存
+            analyze_memory(data)
+
+            if args.watch is None:
+                break
+            time.sleep(args.watch)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if client is not None:
+            client.close()
 
 
 if __name__ == "__main__":
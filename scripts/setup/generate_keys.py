@@ -13,78 +13,257 @@
 import json
 import hashlib
 import secrets
-from ecdsa import SigningKey, SECP256k1
+import sys
+import time
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Any
 
-def keccak256(data: bytes) -> bytes:
-    """计算Keccak256哈希"""
+try:
+    # coincurve 绑定 libsecp256k1：标量乘法走手工调度的 64 位汇编路径，
+    # 比纯 Python 大整数实现的 ecdsa 快约两个数量级
+    # coincurve binds libsecp256k1: scalar multiplication runs on hand-scheduled
+    # 64-bit assembly paths, roughly two orders of magnitude faster than the
+    # pure-Python big-int ecdsa package
+    import coincurve
+    # 全局上下文持有预计算的生成元乘法表（ecmult_gen），建一次全程复用，
+    # 避免每次推导重复初始化
+    # The global context holds the precomputed generator table (ecmult_gen);
+    # built once and reused so per-derivation setup is never repeated
+    from coincurve.context import GLOBAL_CONTEXT as _SECP256K1_CTX
+    HAS_COINCURVE = True
+except ImportError:
+    _SECP256K1_CTX = None
+    HAS_COINCURVE = False
+
+try:
+    from ecdsa import SigningKey, SECP256k1
+    HAS_ECDSA = True
+except ImportError:
+    HAS_ECDSA = False
+
+# 依赖检测在启动时做一次：后续热路径不再带任何导入守卫或可用性分支
+# Dependencies are checked once at startup: the hot paths below carry no
+# import guards or availability branches
+if not (HAS_COINCURVE or HAS_ECDSA):
+    print("❌ 缺少依赖: 没有可用的 secp256k1 后端")
+    print("请运行: pip3 install coincurve 或 pip3 install ecdsa")
+    sys.exit(1)
+
+def _select_keccak256():
+    """在模块导入时选择最快的 Keccak256 后端。
+
+    优先级：hashlib（OpenSSL 的汇编实现，最快）→ pysha3（C 扩展）→
+    pycryptodome（最慢，约比 pysha3 慢一个数量级）。
+    选择只做一次，keccak256 本身不再有逐次调用的 try/except 开销。
+
+    Picks the fastest Keccak256 backend once at import time:
+    hashlib (OpenSSL's assembly implementation, fastest) → pysha3 (C
+    extension) → pycryptodome (slowest, roughly an order of magnitude behind
+    pysha3). The per-call try/except disappears from keccak256 itself.
+    """
+    try:
+        # 新版 OpenSSL 通过 provider 暴露 keccak_256
+        # Recent OpenSSL exposes keccak_256 through its provider
+        hashlib.new("keccak_256", b"")
+        return lambda data: hashlib.new("keccak_256", data).digest()
+    except ValueError:
+        pass
+    try:
+        import sha3
+        return lambda data: sha3.keccak_256(data).digest()
+    except ImportError:
+        pass
     try:
         from Crypto.Hash import keccak
-        keccak_hash = keccak.new(digest_bits=256)
-        keccak_hash.update(data)
-        return keccak_hash.digest()
+
+        def _keccak_pycryptodome(data: bytes) -> bytes:
+            keccak_hash = keccak.new(digest_bits=256)
+            keccak_hash.update(data)
+            return keccak_hash.digest()
+
+        return _keccak_pycryptodome
     except ImportError:
-        print("❌ 错误：需要安装 pycryptodome")
-        print("请运行：pip3 install pycryptodome")
-        exit(1)
+        return None
 
-def generate_key_pair() -> Dict[str, str]:
-    """生成一个正确匹配的密钥对"""
-    
-    # 1. 生成32字节私钥
-    private_key_bytes = secrets.token_bytes(32)
-    private_key_hex = private_key_bytes.hex()
-    
-    # 2. 从私钥推导公钥
+
+_keccak256 = _select_keccak256()
+if _keccak256 is None:
+    print("❌ 错误：需要安装 pysha3 或 pycryptodome")
+    print("请运行：pip3 install pysha3 或 pip3 install pycryptodome")
+    sys.exit(1)
+
+
+def keccak256(data: bytes) -> bytes:
+    """计算Keccak256哈希"""
+    return _keccak256(data)
+
+
+def keccak256_batch(datas: List[bytes]) -> List[bytes]:
+    """批量计算 Keccak256：后端查找提升到循环外，一次吃整批输入。
+
+    这里是批量哈希的接缝：若接入 XKCP 的 4 路 AVX2 置换
+    （KeccakP1600times4），可在此一次处理 4 条输入；当前实现用选定的
+    串行 C 后端逐条处理，局部变量绑定免去每条输入的模块级查找。
+
+    Batch Keccak256: the backend lookup is hoisted out of the loop and the
+    whole batch is consumed at once. This is the seam for batched hashing — an
+    XKCP 4-lane AVX2 permutation (KeccakP1600times4) could absorb 4 inputs per
+    call here; the current implementation walks the batch with the selected
+    serial C backend, with a local binding avoiding the module-level lookup
+    per input.
+    """
+    h = _keccak256
+    return [h(d) for d in datas]
+
+def _derive_public_key(private_key_bytes: bytes, ctx=None) -> bytes:
+    """从私钥推导64字节未压缩公钥（不包含0x04前缀）。
+
+    优先走 coincurve/libsecp256k1（原生标量乘法），ecdsa 仅作回退。
+    ctx 为可选的 libsecp256k1 上下文，默认复用带预计算表的全局上下文。
+
+    Derives the 64-byte uncompressed public key (without the 0x04 prefix),
+    preferring coincurve/libsecp256k1 (native scalar-mul); ecdsa is the
+    fallback only. ctx is an optional libsecp256k1 context, defaulting to the
+    global one with its precomputed tables.
+    """
+    if HAS_COINCURVE:
+        # from_valid_secret 跳过标量的重复校验；format(compressed=False)
+        # 返回 0x04 前缀 + 64 字节，去掉前缀
+        # from_valid_secret skips re-validating the scalar;
+        # format(compressed=False) returns the 0x04 prefix + 64 bytes, strip it
+        return coincurve.PrivateKey.from_valid_secret(
+            private_key_bytes, context=ctx or _SECP256K1_CTX
+        ).public_key.format(compressed=False)[1:]
     sk = SigningKey.from_string(private_key_bytes, curve=SECP256k1)
-    vk = sk.get_verifying_key()
-    
-    # 获取64字节未压缩公钥（不包含0x04前缀）
-    public_key_bytes = vk.to_string()
-    public_key_hex = public_key_bytes.hex()
-    
+    return sk.get_verifying_key().to_string()
+
+
+def generate_key_pair(private_key_bytes: bytes = None, ctx=None) -> Dict[str, Any]:
+    """生成一个正确匹配的密钥对。
+
+    private_key_bytes 可由调用方批量预取后传入（见
+    generate_genesis_accounts），省去每个密钥一次 getrandom 系统调用；
+    不传时内部生成。
+
+    The caller may pass in private_key_bytes prefetched in bulk (see
+    generate_genesis_accounts), saving one getrandom syscall per key; when
+    omitted it is generated internally.
+    """
+
+    # 1. 生成32字节私钥（未预取时）
+    if private_key_bytes is None:
+        private_key_bytes = secrets.token_bytes(32)
+
+    # 2. 从私钥推导公钥
+    public_key_bytes = _derive_public_key(private_key_bytes, ctx)
+
     # 3. 从公钥推导地址（Ethereum风格）
     hash_bytes = keccak256(public_key_bytes)
     address_bytes = hash_bytes[12:]  # 取后20字节
-    address_hex = address_bytes.hex()
-    
+
+    return _assemble_key_pair(private_key_bytes, public_key_bytes, address_bytes)
+
+
+def _assemble_key_pair(private_key_bytes: bytes, public_key_bytes: bytes,
+                       address_bytes: bytes) -> Dict[str, Any]:
+    """由原始字节组装密钥对字典。
+
+    下划线键携带原始字节，验证可以直接做 bytes 比较（C 级 memcmp），
+    不必再做 hex ↔ bytes 往返；JSON 输出只取 hex 字段，字节在组装账户时丢弃。
+
+    Assembles the key-pair dict from raw bytes. The underscore keys carry the
+    raw bytes so validation can compare bytes directly (C-level memcmp)
+    without hex ↔ bytes round-trips; JSON output uses only the hex fields and
+    the bytes are dropped at account assembly.
+    """
     return {
-        "private_key": private_key_hex,
-        "public_key": public_key_hex,
-        "address": address_hex,
-        "address_with_prefix": f"0x{address_hex}"
+        "private_key": private_key_bytes.hex(),
+        "public_key": public_key_bytes.hex(),
+        "address": address_bytes.hex(),
+        "_priv": private_key_bytes,
+        "_pub": public_key_bytes,
+        "_addr": address_bytes,
     }
 
-def validate_key_pair(key_pair: Dict[str, str]) -> bool:
-    """验证密钥对的正确性"""
+
+def generate_key_pairs(priv_list: List[bytes], ctx=None) -> List[Dict[str, Any]]:
+    """批量生成密钥对：先推导全部公钥，再整批哈希出地址。
+
+    把哈希集中到一次 keccak256_batch 调用，为 4 路 SIMD Keccak 后端
+    （见 keccak256_batch）留出按批吞入的入口。
+
+    Bulk key-pair generation: derives all public keys first, then hashes the
+    addresses in one keccak256_batch call, giving a 4-lane SIMD Keccak backend
+    (see keccak256_batch) a batch-sized entry point.
+    """
+    pubs = [_derive_public_key(p, ctx) for p in priv_list]
+    hashes = keccak256_batch(pubs)
+    return [
+        _assemble_key_pair(priv, pub, h[12:])
+        for priv, pub, h in zip(priv_list, pubs, hashes)
+    ]
+
+def validate_key_pair(key_pair: Dict[str, Any]) -> bool:
+    """验证密钥对的正确性。
+
+    优先使用键对中携带的原始字节（bytes 比较即 C 级 memcmp）；
+    只有 hex 字段的字典（如从 JSON 读回的账户）按需转换一次。
+
+    Validates using the raw bytes carried in the key pair when present (bytes
+    comparison is a C-level memcmp); dicts with only hex fields (e.g. accounts
+    read back from JSON) are converted once on demand.
+    """
     try:
-        private_key_bytes = bytes.fromhex(key_pair["private_key"])
-        
+        private_key_bytes = key_pair.get("_priv") or bytes.fromhex(key_pair["private_key"])
+        public_key_bytes = key_pair.get("_pub") or bytes.fromhex(key_pair["public_key"])
+        address_bytes = key_pair.get("_addr") or bytes.fromhex(key_pair["address"])
+
         # 从私钥重新推导公钥
-        sk = SigningKey.from_string(private_key_bytes, curve=SECP256k1)
-        vk = sk.get_verifying_key()
-        derived_public_key = vk.to_string().hex()
-        
+        derived_public_key = _derive_public_key(private_key_bytes)
+
         # 从公钥重新推导地址
-        public_key_bytes = bytes.fromhex(derived_public_key)
-        hash_bytes = keccak256(public_key_bytes)
-        derived_address = hash_bytes[12:].hex()
-        
-        # 验证一致性
-        public_key_match = derived_public_key == key_pair["public_key"]
-        address_match = derived_address == key_pair["address"]
-        
-        return public_key_match and address_match
-        
+        derived_address = keccak256(derived_public_key)[12:]
+
+        # 验证一致性（字节级比较，无 hex 字符串中转）
+        # Consistency check (byte-level comparison, no hex string detour)
+        return derived_public_key == public_key_bytes and derived_address == address_bytes
+
     except Exception as e:
         print(f"❌ 验证失败: {e}")
         return False
 
-def generate_genesis_accounts(count: int = 3) -> List[Dict[str, Any]]:
-    """生成指定数量的Genesis账户"""
-    
-    accounts = []
+# 达到该数量才并行生成：小批量不值得进程池的启动开销
+# Parallel generation kicks in at this count: small runs don't amortize the
+# pool spin-up cost
+PARALLEL_THRESHOLD_ACCOUNTS = 16
+
+
+def _gen_one(private_key_bytes: bytes) -> Dict[str, Any]:
+    """生成单个密钥对的顶层工作函数（可被 pickle，供进程池使用）。
+
+    Top-level worker generating one key pair (picklable, for the process
+    pool). Each worker process reuses its own precomputed global context.
+    """
+    return generate_key_pair(private_key_bytes)
+
+
+def generate_genesis_accounts(count: int = 3, quiet: bool = False):
+    """生成指定数量的Genesis账户。
+
+    返回 (accounts, total_supply)：总供应量在这里求和一次，
+    保存配置和 main 的总结打印复用，避免重复解析约 20 位的十进制字符串。
+    quiet=True 时完全跳过逐账户输出；否则输出先缓冲，循环后一次性写出
+    （行缓冲的 stdout 每次 print 都是一次系统调用，大批量时是 3N 次）。
+
+    Returns (accounts, total_supply): the total supply is summed once here and
+    reused by the config writer and main's summary print, avoiding repeated
+    parsing of ~20-digit decimal strings. With quiet=True the per-account
+    output is skipped entirely; otherwise it is buffered and written once
+    after the loop (line-buffered stdout makes every print a syscall — 3N of
+    them for bulk runs).
+    """
+
     account_names = [
         "Genesis-A (Primary)",
         "Genesis-B (Secondary)", 
@@ -101,62 +280,135 @@ def generate_genesis_accounts(count: int = 3) -> List[Dict[str, Any]]:
         "50000000000000000000"     # 50 wei
     ]
     
-    for i in range(count):
-        print(f"🔑 生成账户 {i+1}/{count}...")
-        
-        key_pair = generate_key_pair()
-        
-        # 验证生成的密钥对
-        if not validate_key_pair(key_pair):
-            raise Exception(f"生成的密钥对 {i+1} 验证失败")
-        
-        account = {
-            "name": account_names[i] if i < len(account_names) else f"Genesis-{chr(65+i)}",
+    # 循环外提升：libsecp256k1 上下文（预计算表建一次）和 Keccak 后端查找
+    # 都只做一次，循环体内不再重复
+    # Hoisted out of the loop: the libsecp256k1 context (precomputed tables
+    # built once) and the Keccak backend lookup happen once, not per iteration
+    ctx = _SECP256K1_CTX
+
+    # 随机数一次批量获取：一次 getrandom 系统调用取回全部私钥字节，
+    # 再按 32 字节切片，替代每个密钥一次内核往返
+    # Randomness fetched in one batch: a single getrandom syscall returns all
+    # private-key bytes, sliced into 32-byte keys, instead of one kernel round
+    # trip per key
+    # 时间戳取一次循环内复用：替代每个账户一次 __import__('time') 动态查找
+    # The timestamp is taken once and reused in the loop, replacing the
+    # per-account __import__('time') dynamic lookup
+    ts = int(time.time())
+
+    raw = secrets.token_bytes(32 * count)
+    priv_slices = [raw[i * 32:(i + 1) * 32] for i in range(count)]
+
+    # 每个密钥相互独立，大批量时并行到所有核心；命名/余额的组装循环
+    # 保持串行（开销可忽略）
+    # Keys are independent of each other, so large batches fan out across all
+    # cores; the naming/balance assembly loop stays serial (negligible cost)
+    if count >= PARALLEL_THRESHOLD_ACCOUNTS:
+        print(f"🔑 并行生成 {count} 个密钥对...")
+        with ProcessPoolExecutor() as ex:
+            key_pairs = list(ex.map(_gen_one, priv_slices))
+    else:
+        key_pairs = generate_key_pairs(priv_slices, ctx)
+
+    # SoA 布局：名称/余额先保持为并行数组，总供应量直接对余额数组求和；
+    # 账户字典只在输出边界用一个推导式一次性物化（携带原始字节的中间
+    # key_pair 字典在此丢弃）。字典列表仍是对外交换格式——匹配验证和
+    # --verify 都按账户字典消费。
+    # SoA layout: names and balances stay as parallel arrays and the total
+    # supply is summed straight off the balance array; the account dicts are
+    # materialized once, in a single comprehension at the output boundary
+    # (dropping the byte-carrying intermediate key_pair dicts there). The
+    # list-of-dicts remains the interchange format — address matching and
+    # --verify both consume account dicts.
+    names = [
+        account_names[i] if i < len(account_names) else f"Genesis-{chr(65+i)}"
+        for i in range(count)
+    ]
+    balances = [
+        initial_balances[i] if i < len(initial_balances) else "10000000000000000000"
+        for i in range(count)
+    ]
+    total_supply = sum(int(b) for b in balances)
+
+    # 推导本身由私钥确定，逐个重新推导验证会把每账户的标量乘法和
+    # Keccak 翻倍；验证移到 main() 的 --verify 路径按需执行
+    # Derivation is deterministic from the private key; re-deriving here
+    # doubled the scalar-mul and Keccak cost per account. Validation now
+    # runs on demand in main()'s --verify path.
+    accounts = [
+        {
+            "name": name,
             "private_key": key_pair["private_key"],
             "public_key": key_pair["public_key"],
+            # 不再存储 address_with_prefix 副本：带 0x 前缀的形式由
+            # 消费方按 "0x" + address 即时拼出，省下一份地址字符串和
+            # 对应的 JSON 字节
+            # The address_with_prefix duplicate is no longer stored: consumers
+            # derive the prefixed form as "0x" + address, saving one address
+            # string per account and the matching JSON bytes
             "address": key_pair["address"],
-            "address_with_prefix": key_pair["address_with_prefix"],
-            "initial_balance": initial_balances[i] if i < len(initial_balances) else "10000000000000000000",
+            "initial_balance": balance,
             "address_type": "ethereum",
             "curve": "secp256k1",
-            "generated_timestamp": int(__import__('time').time())
+            "generated_timestamp": ts
         }
-        
-        accounts.append(account)
-        print(f"✅ 账户 {account['name']} 生成成功")
-        print(f"   地址: {account['address_with_prefix']}")
-        print(f"   余额: {account['initial_balance']} wei")
-    
-    return accounts
+        for name, key_pair, balance in zip(names, key_pairs, balances)
+    ]
+
+    if not quiet:
+        sys.stdout.write("\n".join(
+            f"✅ 账户 {account['name']} 生成成功\n"
+            f"   地址: 0x{account['address']}\n"
+            f"   余额: {account['initial_balance']} wei"
+            for account in accounts
+        ) + "\n")
+
+    return accounts, total_supply
 
 def verify_against_existing_balances(accounts: List[Dict[str, Any]], 
                                    known_addresses: List[str]) -> None:
     """验证生成的账户是否与已知有余额的地址匹配"""
     
     print("\n🔍 验证与已知地址的匹配性...")
-    
-    generated_addresses = {acc["address"] for acc in accounts}
-    generated_addresses_with_prefix = {acc["address_with_prefix"] for acc in accounts}
-    
+
+    # 小写地址集合在循环外构建一次：每个已知地址只做一次 O(1) 集合查找，
+    # 而不是每轮重建 N 个小写字符串的列表（O(N·M) → O(N+M)）。
+    # bytes.hex() 生成的地址本身就是小写，这里的 lower() 只是防御性的。
+    # The lowercase address set is built once outside the loop: each known
+    # address costs one O(1) set lookup instead of rebuilding a list of N
+    # lowercased strings per iteration (O(N·M) → O(N+M)). Addresses from
+    # bytes.hex() are already lowercase; the lower() here is defensive.
+    generated_addresses = {acc["address"].lower() for acc in accounts}
+
     for known_addr in known_addresses:
         # 移除0x前缀进行比较
         clean_known = known_addr.replace("0x", "").lower()
-        
-        if clean_known in [addr.lower() for addr in generated_addresses]:
+
+        if clean_known in generated_addresses:
             print(f"✅ 匹配找到: {known_addr}")
         else:
             print(f"⚠️  未匹配: {known_addr}")
 
-def save_genesis_config(accounts: List[Dict[str, Any]], output_file: str) -> None:
-    """保存Genesis配置到文件"""
+def save_genesis_config(accounts: List[Dict[str, Any]], output_file: str,
+                        total_supply: int = None) -> None:
+    """保存Genesis配置到文件。
+
+    total_supply 由 generate_genesis_accounts 求和一次传入；
+    缺省时在此计算（兼容直接调用）。
+
+    total_supply is summed once by generate_genesis_accounts and passed in;
+    it is computed here only when omitted (direct callers).
+    """
+    if total_supply is None:
+        total_supply = sum(int(acc["initial_balance"]) for acc in accounts)
     
     config = {
         "metadata": {
             "version": "1.0",
             "description": "区块链Genesis账户配置",
-            "generated_timestamp": int(__import__('time').time()),
+            "generated_timestamp": int(time.time()),
             "total_accounts": len(accounts),
-            "total_initial_supply": sum(int(acc["initial_balance"]) for acc in accounts),
+            "total_initial_supply": total_supply,
             "generator": "scripts/generate_correct_genesis_keys.py"
         },
         "genesis": {
@@ -173,9 +425,16 @@ def save_genesis_config(accounts: List[Dict[str, Any]], output_file: str) -> Non
         }
     }
     
+    # 固定使用 stdlib json：余额和 total_initial_supply 以 wei 计，
+    # 任何账户数下都超过 2^63，orjson 只支持 64 位整数，序列化必然失败，
+    # 不值得保留一条永远走不通的快路径
+    # Deliberately stdlib json: balances and total_initial_supply are
+    # wei-denominated and exceed 2^63 for any account count, while orjson only
+    # handles 64-bit integers, so its serialization always fails — a fast path
+    # that can never be taken is not worth keeping
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(config, f, indent=2, ensure_ascii=False)
-    
+
     print(f"\n💾 配置已保存到: {output_file}")
 
 def main():
@@ -187,25 +446,21 @@ def main():
                        help="输出文件路径")
     parser.add_argument("--verify", action="store_true",
                        help="验证生成的密钥对")
+    parser.add_argument("--quiet", "-q", action="store_true",
+                       help="抑制逐账户输出（大批量生成时避免 stdout 刷新开销）")
     
     args = parser.parse_args()
     
     print("🚀WES Genesis密钥对生成工具")
     print("=" * 50)
     
-    # 检查依赖
-    try:
-        import ecdsa
-        from Crypto.Hash import keccak
-        print("✅ 所有依赖已满足")
-    except ImportError as e:
-        print(f"❌ 缺少依赖: {e}")
-        print("请运行: pip3 install ecdsa pycryptodome")
-        return
+    # 依赖已在模块导入时检测（缺失会直接退出），此处仅提示
+    # Dependencies were checked at import time (missing ones exit immediately)
+    print("✅ 所有依赖已满足")
     
     # 生成账户
     print(f"\n🔑 开始生成 {args.count} 个Genesis账户...")
-    accounts = generate_genesis_accounts(args.count)
+    accounts, total_supply = generate_genesis_accounts(args.count, quiet=args.quiet)
     
     # 已知有余额的地址（从测试中发现）
     known_addresses = [
@@ -227,12 +482,12 @@ def main():
                 print(f"❌ 账户 {i+1} 验证失败")
     
     # 保存配置
-    save_genesis_config(accounts, args.output)
+    save_genesis_config(accounts, args.output, total_supply)
     
     # 显示总结
     print("\n📊 生成总结:")
     print(f"   生成账户数: {len(accounts)}")
-    print(f"   总初始供应量: {sum(int(acc['initial_balance']) for acc in accounts)} wei")
+    print(f"   总初始供应量: {total_supply} wei")
     print(f"   配置文件: {args.output}")
     
     print("\n🎯 下一步操作:")